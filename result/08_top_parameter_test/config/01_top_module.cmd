@@ -0,0 +1,7 @@
+[TOP_MODULE_NAME]
+top_param_test_top
+
+[TOP_MODULE_PARAMETERS]
+BASE_WIDTH = 8
+BUS_WIDTH = BASE_WIDTH*2
+COUNT_WIDTH = BUS_WIDTH - 4
\ No newline at end of file
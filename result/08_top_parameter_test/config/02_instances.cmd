@@ -0,0 +1,3 @@
+[INSTANCES]
+adder_bus | simple_adder.v | simple_adder | WIDTH=BUS_WIDTH
+counter_inst | counter.v | counter | WIDTH=COUNT_WIDTH
\ No newline at end of file
@@ -0,0 +1,5 @@
+[TOP_PORTS]
+input | | clk
+input | | reset
+input | | enable
+output | | overflow
\ No newline at end of file
@@ -0,0 +1,5 @@
+[INSTANCE_TO_TOP]
+counter_inst.clk -> clk
+counter_inst.reset -> reset
+counter_inst.enable -> enable
+counter_inst.overflow -> overflow
\ No newline at end of file
@@ -0,0 +1,2 @@
+[INSTANCE_CONNECTIONS]
+# No internal connections needed; instance parameters use top parameters that depend on each other
\ No newline at end of file
@@ -0,0 +1,2 @@
+[INSTANCE_EXPORT_PORTS]
+adder_bus.sum -> bus_sum
\ No newline at end of file
@@ -0,0 +1,26 @@
+module top_param_test_top #(
+    parameter BASE_WIDTH = 8,
+    parameter BUS_WIDTH = BASE_WIDTH*2,
+    parameter COUNT_WIDTH = BUS_WIDTH - 4
+) (
+    input   wire                   clk,
+    input   wire                   reset,
+    input   wire                   enable,
+    output  wire                   overflow,
+    output  wire  [BUS_WIDTH:0]    bus_sum
+);
+
+    simple_adder #(.WIDTH(BUS_WIDTH)) adder_bus (
+        .a  (1'b0),
+        .b  (1'b0),
+        .sum(bus_sum)
+    );
+
+    counter #(.WIDTH(COUNT_WIDTH)) counter_inst (
+        .clk     (clk),
+        .reset   (reset),
+        .enable  (enable),
+        .overflow(overflow)
+    );
+
+endmodule
\ No newline at end of file
@@ -229,8 +229,8 @@ class VerilogGUI {
                     this.updateStatus('Configuration has issues', 'warning');
                     if (data.errors.length > 0 || data.warnings.length > 0) {
                         const report = [
-                            ...data.errors.map(err => `ERROR: ${err}`),
-                            ...data.warnings.map(warn => `WARNING: ${warn}`)
+                            ...data.errors.map(err => `ERROR [${err.error_type}]: ${err.message}`),
+                            ...data.warnings.map(warn => `WARNING [${warn.error_type}]: ${warn.message}`)
                         ].join('\n');
                         this.showErrorReport(report);
                     }
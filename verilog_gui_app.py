@@ -4,17 +4,17 @@ Verilog Wrapper Generator Web GUI
 Flask-based web interface for creating and managing configuration files
 """
 
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify
 import os
-import json
-from verilog_wrapper_generator import WrapperGenerator, ConfigParser
-from typing import Dict, List
+import shutil
+import tempfile
+from verilog_wrapper_generator import WrapperGenerator, ConfigParser, RunContext
 
 app = Flask(__name__)
 
 # Global variables
 config_dir = "./config"
-generator = WrapperGenerator()
+generator = WrapperGenerator()  # holds the shared, warm module library
 config_parser = ConfigParser()
 
 def ensure_config_dir():
@@ -87,40 +87,23 @@ def generate_wrapper():
     try:
         data = request.json
         
-        # Save config temporarily for generation
-        temp_config_dir = "./temp_config"
-        if not os.path.exists(temp_config_dir):
-            os.makedirs(temp_config_dir)
-        
-        file_mapping = {
-            'top_module': '01_top_module.cmd',
-            'instances': '02_instances.cmd',
-            'top_ports': '03_top_ports.cmd',
-            'instance_to_top': '04_instance_to_top.cmd',
-            'instance_connections': '05_instance_connections.cmd',
-            'instance_export_ports': '06_instance_export_port.cmd'
-        }
-        
-        for config_type, filename in file_mapping.items():
-            if config_type in data:
-                filepath = os.path.join(temp_config_dir, filename)
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(data[config_type])
-        
-        # Generate wrapper
-        wrapper_code = generator.generate_wrapper_from_config(temp_config_dir)
-        
-        # Read error report if exists
-        error_report = ""
-        error_file = os.path.join("./rpt", "Error_report.list")
-        if os.path.exists(error_file):
-            with open(error_file, 'r', encoding='utf-8') as f:
-                error_report = f.read()
-        
-        # Cleanup temp directory
-        import shutil
-        if os.path.exists(temp_config_dir):
-            shutil.rmtree(temp_config_dir)
+        temp_dir, temp_config_dir = write_request_config(data)
+        try:
+            context = RunContext(rpt_dir=os.path.join(temp_dir, "rpt"))
+            
+            # Generate wrapper with a per-request generator sharing the parsed module library
+            request_generator = WrapperGenerator(parser=generator.parser)
+            wrapper_code = request_generator.generate_wrapper_from_config(temp_config_dir, context=context)
+            
+            # Read error report if exists
+            error_report = ""
+            error_file = os.path.join(context.rpt_dir, "Error_report.list")
+            if os.path.exists(error_file):
+                with open(error_file, 'r', encoding='utf-8') as f:
+                    error_report = f.read()
+        finally:
+            # Cleanup temp directory
+            shutil.rmtree(temp_dir, ignore_errors=True)
         
         return jsonify({
             'success': True,
@@ -139,27 +122,21 @@ def validate_config():
     try:
         data = request.json
         
-        # Basic validation logic
-        errors = []
-        warnings = []
-        
-        # Validate top module
-        if 'top_module' in data:
-            top_module_content = data['top_module']
-            if '[TOP_MODULE_NAME]' not in top_module_content:
-                errors.append("Top module name section missing")
-        
-        # Validate instances
-        if 'instances' in data:
-            instances_content = data['instances']
-            if '[INSTANCES]' not in instances_content:
-                errors.append("Instances section missing")
+        # Full validation against the shared module library; nothing is generated or written to the report directory
+        temp_dir, temp_config_dir = write_request_config(data)
+        try:
+            request_generator = WrapperGenerator(parser=generator.parser)
+            result = request_generator.check_config_directory(
+                temp_config_dir, context=RunContext(report_level='none', quiet=True))
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
         
         return jsonify({
             'success': True,
-            'valid': len(errors) == 0,
-            'errors': errors,
-            'warnings': warnings
+            'valid': result['valid'],
+            'errors': result['errors'],
+            'warnings': result['warnings'],
+            'summary': result['summary']
         })
     except Exception as e:
         return jsonify({
@@ -167,6 +144,32 @@ def validate_config():
             'error': str(e)
         })
 
+def write_request_config(data):
+    """Write the config files of a request to a new temp directory, return (temp_dir, config_dir)
+    
+    Each request gets its own config and report directories so concurrent users don't clobber each other.
+    """
+    temp_dir = tempfile.mkdtemp(prefix="vwg_")
+    temp_config_dir = os.path.join(temp_dir, "config")
+    os.makedirs(temp_config_dir)
+    
+    file_mapping = {
+        'top_module': '01_top_module.cmd',
+        'instances': '02_instances.cmd',
+        'top_ports': '03_top_ports.cmd',
+        'instance_to_top': '04_instance_to_top.cmd',
+        'instance_connections': '05_instance_connections.cmd',
+        'instance_export_ports': '06_instance_export_port.cmd'
+    }
+    
+    for config_type, filename in file_mapping.items():
+        if config_type in data:
+            filepath = os.path.join(temp_config_dir, filename)
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(data[config_type])
+    
+    return temp_dir, temp_config_dir
+
 def read_config_file(filename):
     """Read a config file, return empty template if not exists"""
     filepath = os.path.join(config_dir, filename)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Verilog Wrapper Generator Client
+Thin client for a generator daemon started with
+`verilog_wrapper_generator.py --serve SOCKET`.  It sends its command line and
+working directory to the daemon and prints the result, so a run costs no
+generator import and no cold module parsing.
+
+Usage: verilog_wrapper_client.py [--socket SOCKET] <generator arguments>
+The socket can also be given in the VWG_SOCKET environment variable.
+"""
+
+import json
+import os
+import socket
+import sys
+
+
+def main(argv=None) -> int:
+    """Forward the command line to the daemon and return its exit code"""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    socket_path = os.environ.get('VWG_SOCKET')
+    if argv[:1] == ['--socket'] and len(argv) > 1:
+        socket_path = argv[1]
+        argv = argv[2:]
+    if not socket_path:
+        print("Error: no daemon socket given (--socket SOCKET or VWG_SOCKET)", file=sys.stderr)
+        return 2
+    
+    request = {'argv': argv, 'cwd': os.getcwd()}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(socket_path)
+            conn.sendall(json.dumps(request).encode('utf-8') + b"\n")
+            with conn.makefile('rb') as f:
+                response = json.loads(f.readline())
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot reach generator daemon at {socket_path}: {e}", file=sys.stderr)
+        return 1
+    
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    return response['exit']
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -8,10 +8,21 @@ It takes a configuration that specifies module files, instance names, and port m
 
 import re
 import json
+import hashlib
+import io
 import argparse
+import contextlib
 import os
-from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Tuple, Optional
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
 
 
@@ -22,69 +33,260 @@ class ValidationError:
     message: str
     config_line: str
     severity: str = "ERROR"  # ERROR, WARNING
+    source: str = ""  # configuration the error came from, set when batch reports are merged
+
+
+class ErrorLimitReached(Exception):
+    """Raised by ErrorReporter.add_error once max_errors errors have been reported"""
+
+
+class AmbiguousFileError(ValueError):
+    """Raised when a Verilog file name is found in more than one search path directory"""
+
+
+@dataclass
+class RunContext:
+    """Per-run settings shared by everything that writes reports
+    
+    Each run (CLI invocation, batch entry, GUI request) can carry its own
+    context, so concurrent runs write to separate report directories without
+    changing the working directory.
+    """
+    rpt_dir: str = "./rpt"
+    report_level: str = "debug"  # one of REPORT_LEVELS, see ReportManager
+    quiet: bool = False  # no per-message console output, only the final summary
+    message_limit: Optional[int] = 20  # console messages shown per error type, None for all
+    max_errors: Optional[int] = None  # stop validation after this many errors, None to validate everything
+    search_paths: Tuple[str, ...] = ()  # extra directories searched for instance files (-y)
+    incremental: bool = False  # reuse unchanged instance blocks saved next to the output file
+    
+    REPORT_LEVELS = ('none', 'errors', 'summary', 'debug')
+    
+    def __post_init__(self):
+        if self.report_level not in self.REPORT_LEVELS:
+            raise ValueError(f"Unknown report level '{self.report_level}', expected one of {', '.join(self.REPORT_LEVELS)}")
+        if self.max_errors is not None and self.max_errors < 1:
+            raise ValueError(f"max_errors must be at least 1, got {self.max_errors}")
+    
+    def ensure_rpt_dir(self) -> str:
+        """Return the report directory, creating it if needed"""
+        os.makedirs(self.rpt_dir, exist_ok=True)
+        return self.rpt_dir
+    
+    def wants_report(self, level: str) -> bool:
+        """Check if reports of the given level are written in this run"""
+        return self.REPORT_LEVELS.index(self.report_level) >= self.REPORT_LEVELS.index(level)
+
+
+class ReportManager:
+    """Buffers the report files of one run and writes each of them once
+    
+    Report producers register a writer per file name; the writer renders the
+    records it captured when flush() runs at the end of the run, and a later
+    registration for the same file replaces the earlier one.  Levels are
+    cumulative:
+    
+      none     no report files
+      errors   Error_report.list
+      summary  errors plus Unconnected_*.list and the 06_final_wrapper.v copy
+      debug    summary plus the 01-05 step reports
+    """
+    
+    def __init__(self, context: RunContext):
+        self.context = context
+        self._writers = {}  # file name -> writer(f), in registration order
+        self._streams = {}  # file name -> open file receiving records as they are found
+    
+    def add(self, name: str, level: str, writer) -> bool:
+        """Register writer(f) to produce report file name; False if the run's report level excludes it"""
+        if not self.context.wants_report(level):
+            return False
+        self._writers[name] = writer
+        return True
+    
+    def open_stream(self, name: str, level: str):
+        """Open report file name for records written as they are found; None if the report level excludes it"""
+        if not self.context.wants_report(level):
+            return None
+        
+        stream = self._streams.get(name)
+        if stream is None:
+            stream = self._streams[name] = open(os.path.join(self.context.ensure_rpt_dir(), name), 'w')
+        return stream
+    
+    def discard(self, stale: Tuple[str, ...] = ()):
+        """Drop every registered report and delete the record files streamed so far
+        
+        Reports named in stale are removed from the report directory too, so a
+        previous run's copies are not mistaken for this run's.
+        """
+        for stream in self._streams.values():
+            stream.close()
+            os.remove(stream.name)
+        self._streams.clear()
+        self._writers.clear()
+        
+        for name in stale:
+            try:
+                os.remove(os.path.join(self.context.rpt_dir, name))
+            except OSError:
+                pass
+    
+    def flush(self):
+        """Close the record streams and write every registered report file"""
+        for stream in self._streams.values():
+            stream.close()
+        self._streams.clear()
+        
+        if not self._writers:
+            return
+        
+        rpt_dir = self.context.ensure_rpt_dir()
+        for name, writer in self._writers.items():
+            with open(os.path.join(rpt_dir, name), 'w') as f:
+                writer(f)
+        self._writers.clear()
 
 
 class ErrorReporter:
-    """Handles error reporting and logging"""
+    """Handles error reporting and logging
     
-    def __init__(self):
+    Every error and warning is kept for the report files, but the console only
+    shows the first message_limit of each severity and type (none when quiet);
+    print_summary() then lists what was held back.
+    """
+    
+    def __init__(self, quiet: bool = False, message_limit: Optional[int] = None):
         self.errors = []
         self.warnings = []
+        self.record_stream = None  # optional open file receiving one JSON line per error or warning
+        self.quiet = quiet
+        self.message_limit = message_limit
+        self.max_errors = None  # set while validating with an error limit
+        self._counts = {}  # (severity, error_type) -> messages reported
     
     def add_error(self, error_type: str, message: str, config_line: str = ""):
         """Add an error to the report"""
         error = ValidationError(error_type, message, config_line, "ERROR")
         self.errors.append(error)
-        print(f"ERROR [{error_type}]: {message}")
-        if config_line:
-            print(f"  Config line: {config_line}")
+        self._stream_record(error)
+        self._console(error)
+        if self.max_errors is not None and len(self.errors) >= self.max_errors:
+            raise ErrorLimitReached(f"Stopped after {len(self.errors)} error(s)")
     
     def add_warning(self, error_type: str, message: str, config_line: str = ""):
         """Add a warning to the report"""
         warning = ValidationError(error_type, message, config_line, "WARNING")
         self.warnings.append(warning)
-        print(f"WARNING [{error_type}]: {message}")
-        if config_line:
-            print(f"  Config line: {config_line}")
+        self._stream_record(warning)
+        self._console(warning)
+    
+    def _console(self, item: ValidationError):
+        key = (item.severity, item.error_type)
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        
+        if self.quiet or (self.message_limit is not None and count >= self.message_limit):
+            return
+        
+        text = f"{item.severity} [{item.error_type}]: {item.message}\n"
+        if item.config_line:
+            text += f"  Config line: {item.config_line}\n"
+        sys.stdout.write(text)
+    
+    def print_summary(self):
+        """Print per-type counts of the messages kept off the console"""
+        hidden = []
+        for (severity, error_type), count in self._counts.items():
+            if not self.quiet and self.message_limit is not None:
+                count -= self.message_limit
+            if self.quiet or count > 0:
+                hidden.append((severity, error_type, count))
+        
+        if not hidden:
+            return
+        
+        print("\nError summary:" if self.quiet else "\nMessages not shown (see the error report for all of them):")
+        for severity, error_type, count in hidden:
+            print(f"  {severity} [{error_type}]: {count}" if self.quiet else f"  {severity} [{error_type}]: {count} more")
+    
+    def _stream_record(self, item: ValidationError):
+        if self.record_stream is not None:
+            self.record_stream.write(json.dumps(asdict(item)) + "\n")
+    
+    def merge(self, other: 'ErrorReporter', source: str = ""):
+        """Append another reporter's errors and warnings without printing them, tagging them with source"""
+        for error in other.errors:
+            self.errors.append(replace(error, source=source))
+        for warning in other.warnings:
+            self.warnings.append(replace(warning, source=source))
     
     def has_errors(self) -> bool:
         """Check if there are any errors"""
         return len(self.errors) > 0
     
-    def generate_error_report(self):
+    def generate_error_report(self, rpt_dir: str = "./rpt"):
         """Generate error report files in rpt directory"""
         import os
         
         # Create rpt directory if it doesn't exist
-        rpt_dir = "./rpt"
         if not os.path.exists(rpt_dir):
             os.makedirs(rpt_dir)
         
         # Write error report
         with open(os.path.join(rpt_dir, "Error_report.list"), 'w') as f:
-            f.write("# Configuration Errors Report\n")
-            f.write("# Generated by Verilog Wrapper Generator\n\n")
-            
-            if self.errors:
-                f.write("=== ERRORS ===\n")
-                for error in self.errors:
-                    f.write(f"[{error.error_type}] {error.message}\n")
-                    if error.config_line:
-                        f.write(f"  Config: {error.config_line}\n")
-                    f.write("\n")
-            
-            if self.warnings:
-                f.write("=== WARNINGS ===\n")
-                for warning in self.warnings:
-                    f.write(f"[{warning.error_type}] {warning.message}\n")
-                    if warning.config_line:
-                        f.write(f"  Config: {warning.config_line}\n")
-                    f.write("\n")
-            
-            if not self.errors and not self.warnings:
-                f.write("No errors or warnings found.\n")
+            self.write_report(f)
+        
+        # Machine-readable copies: one JSON record per line, plus counts by error type
+        with open(os.path.join(rpt_dir, "Error_report.jsonl"), 'w') as f:
+            self.write_jsonl(f)
+        with open(os.path.join(rpt_dir, "Report_summary.json"), 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+            f.write("\n")
         
         print(f"\nError report saved to: {os.path.join(rpt_dir, 'Error_report.list')}")
+    
+    def write_jsonl(self, f):
+        """Write one JSON record per error, then per warning"""
+        for item in self.errors + self.warnings:
+            f.write(json.dumps(asdict(item)) + "\n")
+    
+    def summary(self) -> Dict:
+        """Error and warning totals with counts by error type"""
+        by_error_type = {}
+        for item in self.errors + self.warnings:
+            by_error_type[item.error_type] = by_error_type.get(item.error_type, 0) + 1
+        return {
+            'errors': len(self.errors),
+            'warnings': len(self.warnings),
+            'by_error_type': dict(sorted(by_error_type.items()))
+        }
+    
+    def write_report(self, f):
+        """Write the error report text to an open file"""
+        f.write("# Configuration Errors Report\n")
+        f.write("# Generated by Verilog Wrapper Generator\n\n")
+        
+        if self.errors:
+            f.write("=== ERRORS ===\n")
+            for error in self.errors:
+                source = f"{error.source}: " if error.source else ""
+                f.write(f"[{error.error_type}] {source}{error.message}\n")
+                if error.config_line:
+                    f.write(f"  Config: {error.config_line}\n")
+                f.write("\n")
+        
+        if self.warnings:
+            f.write("=== WARNINGS ===\n")
+            for warning in self.warnings:
+                source = f"{warning.source}: " if warning.source else ""
+                f.write(f"[{warning.error_type}] {source}{warning.message}\n")
+                if warning.config_line:
+                    f.write(f"  Config: {warning.config_line}\n")
+                f.write("\n")
+        
+        if not self.errors and not self.warnings:
+            f.write("No errors or warnings found.\n")
 
 
 @dataclass
@@ -110,57 +312,855 @@ class Instance:
     instance_name: str
     parameters: Dict[str, str]  # parameter_name -> value
     port_mapping: Dict[str, str]  # module_port -> top_port
+    resolved_parameters: Optional[Dict[str, str]] = None  # module parameters with overrides applied, resolved once
 
 
-class VerilogParser:
-    """Parser for extracting module information from Verilog files"""
+class PortRef:
+    """Connection endpoint: 'instance.port[range]', a top port name or TIE0/TIE1/FLOAT
     
-    def __init__(self):
-        # Regex patterns for parsing Verilog
-        # Updated to handle modules with parameters: module name #(parameters) (ports);
-        self.module_pattern = re.compile(r'module\s+(\w+)\s*(?:#\s*\([^)]*\))?\s*\((.*?)\);', re.DOTALL)
-        
-        # Enhanced patterns for different port declaration styles
-        # ANSI style: input [7:0] data, output reg [15:0] result
-        self.ansi_port_pattern = re.compile(r'(input|output|inout)\s*(wire|reg)?\s*(\[.*?\])?\s*(\w+(?:\s*,\s*\w+)*)', re.MULTILINE)
-        
-        # Traditional style: input data; output [15:0] result; input wire data; output reg [15:0] result;
-        # Use non-capturing group for wire/reg and make sure it's followed by whitespace
-        self.traditional_port_pattern = re.compile(r'(input|output|inout)\s+(?:wire\s+|reg\s+)?(\[.*?\])?\s*(\w+(?:\s*,\s*\w+)*)\s*;', re.MULTILINE)
-        
-        # Port list in module declaration
-        self.port_list_pattern = re.compile(r'(\w+)(?:\s*,\s*(\w+))*')
-    
-    def _find_module_declaration(self, content: str) -> Optional[tuple]:
-        """Find module declaration handling complex parameter declarations"""
-        # Use a more robust regex to find module declaration
-        # This pattern matches: module name (optional #(params)) (ports);
-        module_pattern = r'module\s+(\w+)\s*(?:#\s*\([^)]*\))?\s*\((.*?)\)\s*;'
-        
-        # Look for module declaration
-        module_match = re.search(module_pattern, content, re.DOTALL)
-        if not module_match:
-            return None
+    Parsed once from the configuration text; names are interned so the many
+    references to the same instance or port share one string.
+    """
+    
+    __slots__ = ('instance', 'port', 'range', 'key', 'bounds')
+    
+    SPECIAL = ('TIE0', 'TIE1', 'FLOAT')
+    
+    _BOUNDS_RE = re.compile(r'\[\s*(\d+)\s*(?::\s*(\d+)\s*)?\]')
+    
+    def __init__(self, instance: Optional[str], port: str, bit_range: Optional[str] = None):
+        self.instance = sys.intern(instance) if instance is not None else None
+        self.port = sys.intern(port)
+        self.key = sys.intern(f"{instance}.{port}") if instance is not None else self.port
+        self.range = bit_range
+        
+        # Literal slice bounds as (msb, lsb), None for the whole port or a non-literal range
+        self.bounds = None
+        if bit_range:
+            match = self._BOUNDS_RE.match(bit_range)
+            if match:
+                msb = int(match.group(1))
+                self.bounds = (msb, int(match.group(2)) if match.group(2) is not None else msb)
+    
+    @classmethod
+    def parse(cls, spec: str) -> 'PortRef':
+        """Parse 'instance.port', 'instance.port[7:0]', 'top_port' or a special constant"""
+        bit_range = None
+        if '[' in spec and ']' in spec:
+            bit_range = '[' + spec.split('[')[1]
+            spec = spec.split('[')[0]
+        if '.' in spec:
+            instance, port = spec.split('.', 1)
+            return cls(instance, port, bit_range)
+        return cls(None, spec, bit_range)
+    
+    @property
+    def is_special(self) -> bool:
+        return self.instance is None and self.range is None and self.port in self.SPECIAL
+    
+    def __str__(self) -> str:
+        return self.key + self.range if self.range else self.key
+    
+    def __repr__(self) -> str:
+        return f"PortRef({str(self)!r})"
+
+
+class Net:
+    """A configured connection from a source endpoint to a target endpoint"""
+    
+    __slots__ = ('source', 'target')
+    
+    def __init__(self, source: PortRef, target: PortRef):
+        self.source = source
+        self.target = target
+    
+    @property
+    def wire_name(self) -> str:
+        """Concise wire name derived from the source endpoint, e.g. w_u0_data_7_0"""
+        source = self.source
+        range_suffix = ""
+        if source.range:
+            range_suffix = "_" + source.range.replace('[', '').replace(']', '').replace(':', '_')
+        return f"w_{source.key.replace('.', '_')}{range_suffix}"
+    
+    @property
+    def config_line(self) -> str:
+        return f"{self.source} -> {self.target}"
+    
+    def __repr__(self) -> str:
+        return f"Net({self.config_line!r})"
+
+
+class InstanceNode:
+    """A configured instance; validation fills in the resolved file and parsed module"""
+    
+    __slots__ = ('name', 'file', 'module_name', 'parameters', 'module')
+    
+    def __init__(self, name: str, file: str, module_name: Optional[str] = None,
+                 parameters: Optional[Dict[str, str]] = None):
+        self.name = sys.intern(name)
+        self.file = file
+        self.module_name = module_name
+        self.parameters = parameters or {}
+        self.module = None  # Module, once parsed
+    
+    @property
+    def config_line(self) -> str:
+        config_line = f"{self.name} | {self.file}"
+        if self.module_name:
+            config_line += f" | {self.module_name}"
+        if self.parameters:
+            param_str = ", ".join([f"{k}={v}" for k, v in self.parameters.items()])
+            config_line += f" | {param_str}"
+        return config_line
+
+
+class Design:
+    """Netlist intermediate representation of a wrapper configuration
+    
+    Built once from the parsed configuration files; validation, emission and
+    the debug reports all work from it instead of re-parsing 'inst.port[7:0]'
+    strings.
+    """
+    
+    __slots__ = ('top_module', 'top_parameters', 'top_ports', 'instances', 'top_nets', 'nets', 'exports')
+    
+    def __init__(self, top_module: str = 'top_wrapper'):
+        self.top_module = top_module
+        self.top_parameters = {}
+        self.top_ports = []    # List[Port]
+        self.instances = []    # List[InstanceNode]
+        self.top_nets = []     # instance port -> top port or constant
+        self.nets = []         # instance port -> instance port or constant
+        self.exports = []      # instance port -> exported top port
+    
+    @classmethod
+    def from_config(cls, config: Dict) -> 'Design':
+        """Build the design from a configuration dictionary"""
+        design = cls(config.get('top_module', 'top_wrapper'))
+        design.top_parameters = config.get('top_module_parameters', {})
+        design.top_ports = config.get('top_ports', [])
+        design.instances = [InstanceNode(inst_config['instance_name'], inst_config['file'],
+                                         inst_config.get('module_name'), inst_config.get('parameters', {}))
+                            for inst_config in config.get('instances', [])]
+        design.top_nets = [Net(PortRef.parse(inst_port), PortRef.parse(top_port))
+                           for inst_port, top_port in config.get('instance_to_top', {}).items()]
+        design.nets = [Net(PortRef.parse(connection.get('source', '')), PortRef.parse(connection.get('target', '')))
+                       for connection in config.get('instance_connections', [])]
+        design.exports = [Net(PortRef(export_config['instance_name'], export_config['port_name']),
+                              PortRef(None, export_config['export_name']))
+                          for export_config in config.get('instance_export_ports', [])]
+        return design
+
+
+class Token(NamedTuple):
+    """A single lexical token with its character span in the source text"""
+    kind: str  # 'id', 'num', 'str', 'sys', 'op'
+    text: str
+    start: int
+    end: int
+
+
+@dataclass
+class ModuleHeader:
+    """Module interface found by the lexer-based scanner"""
+    name: str
+    ports: List[Port]
+    parameters: Dict[str, str]  # parameter_name -> raw expression, in declaration order
+    start: int  # offset of the 'module' keyword
+    end: Optional[int] = None  # offset just past 'endmodule', None if missing
+
+
+class VerilogLexer:
+    """Single-pass Verilog tokenizer
+    
+    Skips whitespace, comments, attributes and compiler directives (honouring
+    `define/`ifdef/`ifndef/`elsif/`else/`endif within the file).  Module bodies
+    are not tokenized in full: skip_to() jumps from one comment, string,
+    directive or keyword of interest to the next with a regex search, so the
+    whole file is still walked exactly once.
+    """
+    
+    _TOKEN_RE = re.compile(r'''\s*(?:
+          (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+        | (?P<attr>\(\*(?!\s*\)).*?\*\))
+        | (?P<str>"(?:\\.|[^"\\\n])*"?)
+        | (?P<directive>`[A-Za-z_]\w*)
+        | (?P<num>(?:\d[\d_]*\s*)?'[sS]?[bBoOdDhH]\s*[0-9a-fA-FxXzZ?_]+
+                 |\d[\d_]*(?:\.\d[\d_]*)?(?:[eE][+-]?\d[\d_]*)?
+                 |'[01xXzZ])
+        | (?P<sys>\$[A-Za-z_][\w$]*)
+        | (?P<id>[A-Za-z_][\w$]*|\\\S+)
+        | (?P<op><<<|>>>|===|!==|==|!=|<=|>=|&&|\|\||<<|>>|\*\*|~&|~\||~\^|\^~|->|::|\+:|-:|.)
+        | \Z)
+    ''', re.DOTALL | re.VERBOSE)
+    
+    # Trivia that must be stepped over when searching for keywords.  The
+    # search patterns deliberately have no capturing groups: that keeps the
+    # regex engine on its fast path, and matches are classified by their
+    # first character instead.
+    _SKIP_TRIVIA = r'//[^\n]*|/\*.*?(?:\*/|\Z)|\(\*(?!\s*\)).*?\*\)|"(?:\\.|[^"\\\n])*"?|`[A-Za-z_]\w*'
+    
+    _DIRECTIVE_ARG_RE = re.compile(r'[ \t]*([A-Za-z_]\w*)')
+    _LINE_REST_RE = re.compile(r'(?:[^\n\\]|\\.)*', re.DOTALL)
+    
+    # Directives without arguments; everything else consumes the rest of its line
+    _BARE_DIRECTIVES = {'celldefine', 'endcelldefine', 'resetall', 'nounconnected_drive', 'end_keywords'}
+    _LINE_DIRECTIVES = {'define', 'undef', 'include', 'timescale', 'default_nettype', 'line',
+                        'pragma', 'unconnected_drive', 'begin_keywords', 'undefineall'}
+    _CONDITIONAL_DIRECTIVES = {'ifdef', 'ifndef', 'elsif', 'else', 'endif'}
+    
+    _WORD_CHARS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$')
+    
+    _skip_patterns = {}
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.defines = set()
+        self.active = True
+        self._conditions = []  # stack of [parent_active, branch_taken]
+    
+    @classmethod
+    def _skip_pattern(cls, keywords: frozenset):
+        """Compiled search pattern for trivia and the given keywords"""
+        pattern = cls._skip_patterns.get(keywords)
+        if pattern is None:
+            alternatives = [cls._SKIP_TRIVIA] + sorted(keywords)
+            pattern = re.compile('(?:' + '|'.join(alternatives) + ')', re.DOTALL)
+            cls._skip_patterns[keywords] = pattern
+        return pattern
+    
+    def _handle_directive(self, name: str, pos: int) -> Optional[int]:
+        """Process a compiler directive ending at pos
         
-        module_name = module_match.group(1)
-        port_section = module_match.group(2)
+        Returns the position to continue from, or None if the directive is a
+        macro usage that should be treated as an identifier.
+        """
+        if name in self._CONDITIONAL_DIRECTIVES:
+            arg = None
+            if name in ('ifdef', 'ifndef', 'elsif'):
+                arg_match = self._DIRECTIVE_ARG_RE.match(self.text, pos)
+                if arg_match:
+                    arg = arg_match.group(1)
+                    pos = arg_match.end()
+            
+            if name in ('ifdef', 'ifndef'):
+                condition = (arg in self.defines) == (name == 'ifdef')
+                self._conditions.append([self.active, condition])
+                self.active = self.active and condition
+            elif self._conditions:
+                parent_active, taken = self._conditions[-1]
+                if name == 'elsif':
+                    condition = not taken and arg in self.defines
+                    self.active = parent_active and condition
+                    self._conditions[-1][1] = taken or condition
+                elif name == 'else':
+                    self.active = parent_active and not taken
+                    self._conditions[-1][1] = True
+                else:
+                    self._conditions.pop()
+                    self.active = parent_active
+            return pos
+        
+        if name in self._BARE_DIRECTIVES:
+            return pos
+        
+        if name in self._LINE_DIRECTIVES:
+            if name in ('define', 'undef'):
+                arg_match = self._DIRECTIVE_ARG_RE.match(self.text, pos)
+                if arg_match:
+                    if name == 'define':
+                        self.defines.add(arg_match.group(1))
+                    else:
+                        self.defines.discard(arg_match.group(1))
+            return self._LINE_REST_RE.match(self.text, pos).end()
         
-        return (module_name, port_section)
+        return None
     
-    def _find_specific_module(self, content: str, target_module_name: str) -> Optional[tuple]:
-        """Find a specific module declaration by name"""
-        # Use a more robust regex to find specific module declaration
-        # This pattern matches: module target_name (optional #(params)) (ports);
-        module_pattern = rf'module\s+{re.escape(target_module_name)}\s*(?:#\s*\([^)]*\))?\s*\((.*?)\)\s*;'
+    def _skip_inactive(self, pos: int) -> int:
+        """Skip text excluded by conditional compilation"""
+        pattern = self._skip_pattern(frozenset())
+        while not self.active:
+            match = pattern.search(self.text, pos)
+            if not match:
+                return len(self.text)
+            pos = match.end()
+            name = match.group()[1:]
+            if match.group()[0] == '`' and name in self._CONDITIONAL_DIRECTIVES:
+                pos = self._handle_directive(name, pos)
+        return pos
+    
+    def next_token(self) -> Optional[Token]:
+        """Return the next significant token, or None at end of input"""
+        text = self.text
+        pos = self.pos
+        while True:
+            match = self._TOKEN_RE.match(text, pos)
+            kind = match.lastgroup
+            pos = match.end()
+            if kind is None:
+                self.pos = pos
+                return None
+            if kind in ('comment', 'attr'):
+                continue
+            token_text = match.group(kind)
+            start = match.start(kind)
+            if kind == 'directive':
+                next_pos = self._handle_directive(token_text[1:], pos)
+                if next_pos is not None:
+                    pos = self._skip_inactive(next_pos)
+                    continue
+                kind = 'id'  # macro usage, e.g. `DATA_WIDTH
+            self.pos = pos
+            return Token(kind, token_text, start, pos)
+    
+    def skip_to(self, keywords: frozenset) -> Optional[Token]:
+        """Advance to the next occurrence of one of the keywords outside trivia"""
+        pattern = self._skip_pattern(keywords)
+        text = self.text
+        pos = self._skip_inactive(self.pos)
+        
+        while True:
+            match = pattern.search(text, pos)
+            if not match:
+                self.pos = len(text)
+                return None
+            start, pos = match.span()
+            first = text[start]
+            
+            if first == '`':
+                next_pos = self._handle_directive(match.group()[1:], pos)
+                if next_pos is not None:
+                    pos = self._skip_inactive(next_pos)
+            elif first not in '/("':
+                # Keyword candidate: must not be part of a longer identifier
+                if ((start == 0 or text[start - 1] not in self._WORD_CHARS and text[start - 1] not in '`\\')
+                        and (pos == len(text) or text[pos] not in self._WORD_CHARS)):
+                    self.pos = pos
+                    return Token('id', match.group(), start, pos)
+    
+    def collect_until(self, closer: str) -> Tuple[List[Token], Optional[Token]]:
+        """Collect tokens up to closer at nesting depth zero
         
-        # Look for module declaration
-        module_match = re.search(module_pattern, content, re.DOTALL)
-        if not module_match:
-            return None
+        For a bracket closer the opening bracket must already be consumed.
+        Returns the collected tokens and the closing token (None if input
+        ended first).
+        """
+        tokens = []
+        depth = 0
+        while True:
+            token = self.next_token()
+            if token is None:
+                return tokens, None
+            if token.kind == 'op':
+                if token.text in ('(', '[', '{'):
+                    depth += 1
+                elif token.text in (')', ']', '}'):
+                    if depth == 0 and token.text == closer:
+                        return tokens, token
+                    depth -= 1
+                elif token.text == closer and depth == 0:
+                    return tokens, token
+            tokens.append(token)
+
+
+def tokens_to_text(tokens: List[Token]) -> str:
+    """Rebuild source text from tokens, collapsing any gap to a single space"""
+    parts = []
+    prev_end = None
+    for token in tokens:
+        if prev_end is not None and token.start > prev_end:
+            parts.append(' ')
+        parts.append(token.text)
+        prev_end = token.end
+    return ''.join(parts)
+
+
+def split_tokens(tokens: List[Token], separator: str = ',') -> List[List[Token]]:
+    """Split a token list on a separator at nesting depth zero"""
+    items = [[]]
+    depth = 0
+    for token in tokens:
+        if token.kind == 'op':
+            if token.text in ('(', '[', '{'):
+                depth += 1
+            elif token.text in (')', ']', '}'):
+                depth -= 1
+            elif token.text == separator and depth == 0:
+                items.append([])
+                continue
+        items[-1].append(token)
+    return [item for item in items if item]
+
+
+def split_range(text: str) -> List[str]:
+    """Split 'msb:lsb' on the range colon, ignoring ?: colons and nested brackets"""
+    lexer = VerilogLexer(text)
+    depth = 0
+    pending_conditions = 0
+    token = lexer.next_token()
+    while token is not None:
+        if token.kind == 'op':
+            if token.text in ('(', '[', '{'):
+                depth += 1
+            elif token.text in (')', ']', '}'):
+                depth -= 1
+            elif depth == 0 and token.text == '?':
+                pending_conditions += 1
+            elif depth == 0 and token.text == ':':
+                if not pending_conditions:
+                    return [text[:token.start], text[token.end:]]
+                pending_conditions -= 1
+        token = lexer.next_token()
+    return [text]
+
+
+class ConstantExpression:
+    """Verilog constant expression, compiled once and evaluated many times
+    
+    The text is tokenized with VerilogLexer and parsed by precedence climbing
+    into a tree of closures.  compile() caches the result by source text, so
+    evaluating the same expression under different parameter bindings never
+    re-parses it.  Supported: sized and based literals, reals, parameter names,
+    unary, binary and ternary operators and $clog2.  Nothing is handed to
+    Python's eval, so untrusted configuration values are safe to evaluate.
+    Anything that cannot be evaluated raises ValueError.
+    """
+    
+    __slots__ = ('text', 'names', '_identifiers', '_evaluate', '_error')
+    
+    _cache = {}
+    _CACHE_LIMIT = 65536
+    
+    # Guard against unbounded integers from hostile operands: results of *, ** and <<
+    # are size-checked before they are computed
+    _MAX_BITS = 65536
+    
+    # Binary operator precedence, higher binds tighter (IEEE 1364-2005 table 5-4)
+    _PRECEDENCE = {
+        '**': 11,
+        '*': 10, '/': 10, '%': 10,
+        '+': 9, '-': 9,
+        '<<': 8, '>>': 8, '<<<': 8, '>>>': 8,
+        '<': 7, '<=': 7, '>': 7, '>=': 7,
+        '==': 6, '!=': 6, '===': 6, '!==': 6,
+        '&': 5,
+        '^': 4, '~^': 4, '^~': 4,
+        '|': 3,
+        '&&': 2,
+        '||': 1,
+    }
+    
+    _BINARY_OPERATORS = {
+        '**': lambda a, b: ConstantExpression._power(a, b),
+        '*': lambda a, b: ConstantExpression._multiply(a, b),
+        '/': lambda a, b: ConstantExpression._divide(a, b),
+        '%': lambda a, b: ConstantExpression._modulo(a, b),
+        '+': lambda a, b: a + b,
+        '-': lambda a, b: a - b,
+        '<<': lambda a, b: ConstantExpression._shift(a, b, True),
+        '<<<': lambda a, b: ConstantExpression._shift(a, b, True),
+        '>>': lambda a, b: ConstantExpression._shift(a, b, False),
+        '>>>': lambda a, b: ConstantExpression._shift(a, b, False),
+        '<': lambda a, b: int(a < b),
+        '<=': lambda a, b: int(a <= b),
+        '>': lambda a, b: int(a > b),
+        '>=': lambda a, b: int(a >= b),
+        '==': lambda a, b: int(a == b),
+        '!=': lambda a, b: int(a != b),
+        '===': lambda a, b: int(a == b),
+        '!==': lambda a, b: int(a != b),
+        '&': lambda a, b: a & b,
+        '^': lambda a, b: a ^ b,
+        '~^': lambda a, b: ~(a ^ b),
+        '^~': lambda a, b: ~(a ^ b),
+        '|': lambda a, b: a | b,
+    }
+    
+    _UNARY_OPERATORS = {
+        '+': lambda a: a,
+        '-': lambda a: -a,
+        '!': lambda a: int(not a),
+        '~': lambda a: ~a,
+    }
+    
+    _BASES = {'b': 2, 'o': 8, 'd': 10, 'h': 16}
+    
+    def __init__(self, text: str):
+        self.text = text
+        self._evaluate = None
+        self._error = None
+        
+        tokens = []
+        lexer = VerilogLexer(text)
+        token = lexer.next_token()
+        while token is not None:
+            tokens.append(token)
+            token = lexer.next_token()
+        self._identifiers = [token for token in tokens if token.kind == 'id']
+        self.names = tuple(dict.fromkeys(token.text for token in self._identifiers))  # in order of first use
         
-        port_section = module_match.group(1)
+        try:
+            if not tokens:
+                raise ValueError("empty expression")
+            evaluate, index = self._parse_ternary(tokens, 0)
+            if index < len(tokens):
+                raise ValueError(f"unexpected '{tokens[index].text}'")
+            self._evaluate = evaluate
+        except ValueError as e:
+            self._error = f"cannot parse '{text}': {e}"
+        except RecursionError:
+            self._error = f"cannot parse '{text}': nested too deeply"
+    
+    @classmethod
+    def compile(cls, text: str) -> 'ConstantExpression':
+        """Return the compiled expression for text, parsing it only on first use"""
+        expression = cls._cache.get(text)
+        if expression is None:
+            if len(cls._cache) >= cls._CACHE_LIMIT:
+                cls._cache.clear()
+            expression = cls(text)
+            cls._cache[text] = expression
+        return expression
+    
+    def evaluate(self, bindings: Dict[str, object] = None):
+        """Evaluate with identifiers bound to numbers or constant expression strings"""
+        if self._error is not None:
+            raise ValueError(self._error)
+        try:
+            return self._evaluate(bindings or {})
+        except (TypeError, OverflowError) as e:
+            raise ValueError(f"cannot evaluate '{self.text}': {e}") from None
+        except RecursionError:
+            # Deep nesting in a bound expression, or parameters that refer to each other in a cycle
+            raise ValueError(f"cannot evaluate '{self.text}': nested too deeply") from None
+    
+    def substitute(self, bindings: Dict[str, object]) -> str:
+        """Replace bound identifiers by their values in the source text"""
+        parts = []
+        pos = 0
+        for token in self._identifiers:
+            if token.text in bindings:
+                value = str(bindings[token.text])
+                if not re.fullmatch(r"[\w$'.]+", value):
+                    value = f"({value})"
+                parts.append(self.text[pos:token.start])
+                parts.append(value)
+                pos = token.end
+        parts.append(self.text[pos:])
+        return ''.join(parts)
+    
+    @classmethod
+    def _parse_ternary(cls, tokens: List[Token], index: int):
+        condition, index = cls._parse_binary(tokens, index, 1)
+        if index < len(tokens) and tokens[index].text == '?':
+            if_true, index = cls._parse_ternary(tokens, index + 1)
+            if index >= len(tokens) or tokens[index].text != ':':
+                raise ValueError("missing ':' in conditional expression")
+            if_false, index = cls._parse_ternary(tokens, index + 1)
+            return (lambda b: if_true(b) if condition(b) else if_false(b)), index
+        return condition, index
+    
+    @classmethod
+    def _parse_binary(cls, tokens: List[Token], index: int, min_precedence: int):
+        left, index = cls._parse_unary(tokens, index)
+        while index < len(tokens):
+            token = tokens[index]
+            precedence = cls._PRECEDENCE.get(token.text) if token.kind == 'op' else None
+            if precedence is None or precedence < min_precedence:
+                break
+            right, index = cls._parse_binary(tokens, index + 1, precedence + 1)
+            if token.text == '&&':
+                left = (lambda l, r: lambda b: int(bool(l(b)) and bool(r(b))))(left, right)
+            elif token.text == '||':
+                left = (lambda l, r: lambda b: int(bool(l(b)) or bool(r(b))))(left, right)
+            else:
+                operator = cls._BINARY_OPERATORS[token.text]
+                left = (lambda op, l, r: lambda b: op(l(b), r(b)))(operator, left, right)
+        return left, index
+    
+    @classmethod
+    def _parse_unary(cls, tokens: List[Token], index: int):
+        if index >= len(tokens):
+            raise ValueError("unexpected end of expression")
+        token = tokens[index]
+        if token.kind == 'op' and token.text in cls._UNARY_OPERATORS:
+            operand, index = cls._parse_unary(tokens, index + 1)
+            operator = cls._UNARY_OPERATORS[token.text]
+            return (lambda b: operator(operand(b))), index
+        return cls._parse_primary(tokens, index)
+    
+    @classmethod
+    def _parse_primary(cls, tokens: List[Token], index: int):
+        token = tokens[index]
+        if token.kind == 'num':
+            value = cls._parse_number(token.text)
+            return (lambda b: value), index + 1
+        if token.kind == 'id':
+            name = token.text
+            return (lambda b: cls._lookup(b, name)), index + 1
+        if token.kind == 'sys' and token.text == '$clog2':
+            if index + 1 >= len(tokens) or tokens[index + 1].text != '(':
+                raise ValueError("expected '(' after $clog2")
+            argument, index = cls._parse_ternary(tokens, index + 2)
+            if index >= len(tokens) or tokens[index].text != ')':
+                raise ValueError("missing ')'")
+            return (lambda b: cls._clog2(argument(b))), index + 1
+        if token.text == '(':
+            inner, index = cls._parse_ternary(tokens, index + 1)
+            if index >= len(tokens) or tokens[index].text != ')':
+                raise ValueError("missing ')'")
+            return inner, index + 1
+        raise ValueError(f"unsupported '{token.text}'")
+    
+    @classmethod
+    def _parse_number(cls, text: str):
+        """Value of a numeric literal such as 16, 1.5, 'h1F or 8'sb1000_0000"""
+        text = ''.join(text.split()).replace('_', '')
+        if "'" not in text:
+            if any(char in text for char in '.eE'):
+                return float(text)
+            return int(text)
+        
+        size, digits = text.split("'", 1)
+        if digits == '0':
+            return 0
+        signed = digits[0] in 'sS'
+        if signed:
+            digits = digits[1:]
+        base = cls._BASES.get(digits[:1].lower())
+        digits = digits[1:]
+        if base is None or not digits:
+            raise ValueError(f"unsupported literal '{text}'")
+        if any(char in 'xXzZ?' for char in digits):
+            raise ValueError(f"literal '{text}' has x/z bits")
+        value = int(digits, base)
+        if size:
+            size = int(size)
+            if size <= 0:
+                raise ValueError(f"invalid literal size in '{text}'")
+            if size > cls._MAX_BITS:
+                raise ValueError(f"literal size too large in '{text}'")
+            value &= (1 << size) - 1
+            if signed and value >> (size - 1):
+                value -= 1 << size
+        return value
+    
+    @staticmethod
+    def _lookup(bindings: Dict[str, object], name: str):
+        try:
+            value = bindings[name]
+        except KeyError:
+            raise ValueError(f"unresolved identifier '{name}'") from None
+        if isinstance(value, str):
+            value = ConstantExpression.compile(value).evaluate()
+        return value
+    
+    @staticmethod
+    def _clog2(value):
+        value = int(round(value))
+        return (value - 1).bit_length() if value > 0 else 0
+    
+    @staticmethod
+    def _divide(a, b):
+        if b == 0:
+            raise ValueError("division by zero")
+        if isinstance(a, int) and isinstance(b, int):
+            # Verilog integer division truncates toward zero
+            quotient = abs(a) // abs(b)
+            return quotient if (a < 0) == (b < 0) else -quotient
+        return a / b
+    
+    @staticmethod
+    def _modulo(a, b):
+        if not (isinstance(a, int) and isinstance(b, int)):
+            raise ValueError("modulus of real operands")
+        if b == 0:
+            raise ValueError("modulus by zero")
+        remainder = abs(a) % abs(b)
+        return -remainder if a < 0 else remainder
+    
+    @staticmethod
+    def _multiply(a, b):
+        if isinstance(a, int) and isinstance(b, int):
+            if a.bit_length() + b.bit_length() > ConstantExpression._MAX_BITS:
+                raise ValueError("product too large")
+        return a * b
+    
+    @staticmethod
+    def _power(a, b):
+        if isinstance(a, int) and isinstance(b, int):
+            if b < 0:
+                if a == 0:
+                    raise ValueError("zero to a negative power")
+                return a if a in (1, -1) and b % 2 else int(a in (1, -1))
+            if abs(a) > 1 and a.bit_length() * b > ConstantExpression._MAX_BITS:
+                raise ValueError("power too large")
+        try:
+            return a ** b
+        except OverflowError:
+            raise ValueError("power too large")
+    
+    @staticmethod
+    def _shift(a, b, left: bool):
+        if not (isinstance(a, int) and isinstance(b, int)):
+            raise ValueError("shift of real operands")
+        if b < 0:
+            raise ValueError("negative shift amount")
+        if left:
+            if a and a.bit_length() + b > ConstantExpression._MAX_BITS:
+                raise ValueError("shift result too large")
+            return a << b
+        return a >> b
+
+
+class BitRangeSet:
+    """Set of bit indices kept as an integer bitmask
+    
+    Adding a slice or testing coverage is a handful of big-int operations
+    whatever the port width, and uncovered bits are returned as maximal
+    ranges, so the cost follows the number of slices rather than bits.
+    """
+    
+    __slots__ = ('mask',)
+    
+    def __init__(self):
+        self.mask = 0
+    
+    @staticmethod
+    def span(msb: int, lsb: int) -> int:
+        """Bitmask of the bits between msb and lsb inclusive (either order)
         
-        return (target_module_name, port_section)
+        Indices are limited to ConstantExpression._MAX_BITS so a bogus range
+        cannot make the mask exhaust memory.
+        """
+        low, high = min(msb, lsb), max(msb, lsb)
+        if high >= ConstantExpression._MAX_BITS:
+            raise ValueError(f"bit index {high} out of range")
+        return ((1 << (high - low + 1)) - 1) << low
+    
+    def add(self, msb: int, lsb: int) -> int:
+        """Add a slice and return the mask of bits that were already present"""
+        bits = self.span(msb, lsb)
+        overlap = self.mask & bits
+        self.mask |= bits
+        return overlap
+    
+    def covers(self, msb: int, lsb: int) -> bool:
+        bits = self.span(msb, lsb)
+        return self.mask & bits == bits
+    
+    def missing(self, msb: int, lsb: int) -> List[Tuple[int, int]]:
+        """Uncovered (high, low) runs within msb..lsb, lowest first"""
+        return self.ranges(self.span(msb, lsb) & ~self.mask)
+    
+    @staticmethod
+    def ranges(mask: int) -> List[Tuple[int, int]]:
+        """Split a bitmask into maximal (high, low) runs of set bits, lowest first"""
+        runs = []
+        while mask:
+            low = (mask & -mask).bit_length() - 1
+            shifted = mask >> low
+            length = (shifted ^ (shifted + 1)).bit_length() - 1
+            runs.append((low + length - 1, low))
+            mask &= ~(((1 << length) - 1) << low)
+        return runs
+    
+    @staticmethod
+    def format_range(high: int, low: int) -> str:
+        return f"[{low}]" if high == low else f"[{high}:{low}]"
+
+
+class VerilogParser:
+    """Parser for extracting module information from Verilog files"""
+    
+    DIRECTIONS = {'input', 'output', 'inout'}
+    
+    # Keywords that may sit between a direction/parameter keyword and the range or name
+    TYPE_KEYWORDS = {'wire', 'reg', 'logic', 'bit', 'var', 'signed', 'unsigned', 'integer', 'int',
+                     'real', 'realtime', 'time', 'tri', 'tri0', 'tri1', 'triand', 'trior', 'trireg',
+                     'wand', 'wor', 'uwire', 'supply0', 'supply1', 'parameter', 'localparam'}
+    
+    _MODULE_KEYWORDS = frozenset({'module', 'macromodule'})
+    _BODY_KEYWORDS = frozenset({'input', 'output', 'inout', 'parameter', 'localparam',
+                                'function', 'task', 'endmodule'})
+    
+    def __init__(self):
+        # Per-file module index; every file is scanned at most once
+        self.library = ModuleLibrary(self)
+    
+    def scan_modules(self, content: str) -> List[ModuleHeader]:
+        """Scan Verilog source once and return the interface of every module in it"""
+        lexer = VerilogLexer(content)
+        modules = []
+        
+        while True:
+            module_token = lexer.skip_to(self._MODULE_KEYWORDS)
+            if module_token is None:
+                break
+            name_token = lexer.next_token()
+            if name_token is None or name_token.kind != 'id':
+                continue
+            
+            parameters = {}
+            header_ports = None
+            token = lexer.next_token()
+            
+            # SystemVerilog package imports in the header
+            while token is not None and token.text == 'import':
+                lexer.collect_until(';')
+                token = lexer.next_token()
+            
+            if token is not None and token.text == '#':
+                token = lexer.next_token()
+                if token is not None and token.text == '(':
+                    param_tokens, _ = lexer.collect_until(')')
+                    parameters.update(self._parse_parameter_tokens(param_tokens))
+                    token = lexer.next_token()
+            
+            if token is not None and token.text == '(':
+                header_ports, _ = lexer.collect_until(')')
+                token = lexer.next_token()
+            
+            if token is not None and token.text != ';':
+                # Malformed header; resume scanning from here
+                lexer.collect_until(';')
+            
+            header = ModuleHeader(name=name_token.text, ports=[], parameters=parameters, start=module_token.start)
+            body_declarations = []
+            
+            # Walk the body, tokenizing only declarations of interest
+            while True:
+                keyword = lexer.skip_to(self._BODY_KEYWORDS)
+                if keyword is None:
+                    break
+                if keyword.text == 'endmodule':
+                    header.end = keyword.end
+                    break
+                if keyword.text == 'function':
+                    lexer.skip_to(frozenset({'endfunction'}))
+                elif keyword.text == 'task':
+                    lexer.skip_to(frozenset({'endtask'}))
+                elif keyword.text in ('parameter', 'localparam'):
+                    statement, _ = lexer.collect_until(';')
+                    header.parameters.update(self._parse_parameter_tokens([keyword] + statement))
+                else:
+                    statement, _ = lexer.collect_until(';')
+                    body_declarations.append([keyword] + statement)
+            
+            header.ports = self._parse_ports(header_ports or [], body_declarations)
+            modules.append(header)
+        
+        return modules
+    
+    def _find_module_declaration(self, modules: Dict[str, ModuleHeader]) -> Optional[ModuleHeader]:
+        """Find the first module declared in a file"""
+        return next(iter(modules.values()), None)
+    
+    def _find_specific_module(self, modules: Dict[str, ModuleHeader], target_module_name: str) -> Optional[ModuleHeader]:
+        """Find a specific module declaration by name"""
+        return modules.get(target_module_name)
     
     def parse_module(self, file_path: str, target_module_name: str = None) -> Module:
         """Parse a Verilog file and extract module information
@@ -169,174 +1169,607 @@ class VerilogParser:
             file_path: Path to the Verilog file
             target_module_name: Specific module name to parse (optional)
         """
-        try:
-            with open(file_path, 'r') as f:
-                content = f.read()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Verilog file not found: {file_path}")
-        
-        # Remove comments
-        content = re.sub(r'//.*', '', content)
-        content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
+        modules = self.library.get_modules(file_path)
         
         # If target module name is specified, find that specific module
         if target_module_name:
-            module_match = self._find_specific_module(content, target_module_name)
-            if not module_match:
+            header = self._find_specific_module(modules, target_module_name)
+            if not header:
                 raise ValueError(f"Module '{target_module_name}' not found in {file_path}")
         else:
-            # Find first module declaration with improved parsing
-            module_match = self._find_module_declaration(content)
-            if not module_match:
+            # Find first module declaration
+            header = self._find_module_declaration(modules)
+            if not header:
                 raise ValueError(f"No module declaration found in {file_path}")
         
-        module_name = module_match[0]
-        port_list = module_match[1]
-        
-        # Get module content
-        module_end = content.find('endmodule')
-        if module_end == -1:
+        if header.end is None:
             raise ValueError(f"No endmodule found in {file_path}")
         
-        # Find the end of module declaration to extract module body
-        module_decl_end = content.find(';', content.find('module'))
-        if module_decl_end == -1:
-            raise ValueError(f"Invalid module declaration in {file_path}")
+        return Module(name=header.name, ports=list(header.ports), file_path=file_path)
+    
+    def _parse_parameter_tokens(self, tokens: List[Token]) -> Dict[str, str]:
+        """Parse parameter/localparam declarations from a token list
+        
+        Handles both header lists (#(parameter A = 1, B = 2)) and body
+        statements (localparam [3:0] C = A + B, D = 4).
+        """
+        param_dict = {}
         
-        module_content = content[module_decl_end + 1:module_end]
+        for item in split_tokens(tokens):
+            equals = next((i for i, token in enumerate(item) if token.text == '='), None)
+            if equals is None or equals == 0:
+                continue
+            
+            # The name is the last identifier before '=' (skips types and ranges)
+            name_token = None
+            depth = 0
+            for token in item[:equals]:
+                if token.text in ('[', '('):
+                    depth += 1
+                elif token.text in (']', ')'):
+                    depth -= 1
+                elif depth == 0 and token.kind == 'id' and token.text not in self.TYPE_KEYWORDS:
+                    name_token = token
+            
+            if name_token is not None:
+                param_dict[name_token.text] = tokens_to_text(item[equals + 1:])
         
-        # Remove parameter and localparam declarations from module body only
-        module_content = re.sub(r'parameter\s+[^;]+;', '', module_content, flags=re.MULTILINE)
-        module_content = re.sub(r'localparam\s+[^;]+;', '', module_content, flags=re.MULTILINE)
+        return param_dict
+    
+    def _parse_declaration(self, tokens: List[Token]) -> Tuple[Optional[str], Optional[str], List[str]]:
+        """Split a port declaration into (direction, width, names)
         
-        # Parse ports using enhanced parser
-        ports = self._parse_ports(port_list, module_content)
+        Direction is None when the declaration carries no direction keyword
+        (an ANSI continuation or a non-ANSI port name).
+        """
+        direction = None
+        width = None
+        names = []
+        i = 0
         
-        return Module(name=module_name, ports=ports, file_path=file_path)
+        if i < len(tokens) and tokens[i].text in self.DIRECTIONS:
+            direction = tokens[i].text
+            i += 1
+        
+        while i < len(tokens) and tokens[i].text in self.TYPE_KEYWORDS:
+            i += 1
+        
+        # Packed dimensions
+        range_start = i
+        while i < len(tokens) and tokens[i].text == '[':
+            depth = 0
+            while i < len(tokens):
+                if tokens[i].text == '[':
+                    depth += 1
+                elif tokens[i].text == ']':
+                    depth -= 1
+                    if depth == 0:
+                        i += 1
+                        break
+                i += 1
+        if i > range_start:
+            width = tokens_to_text(tokens[range_start:i])
+        
+        for item in split_tokens(tokens[i:]):
+            if item[0].text == '.':
+                # Named port expression .name(signal)
+                if len(item) > 1 and item[1].kind == 'id':
+                    names.append(item[1].text)
+            elif item[0].kind == 'id':
+                names.append(item[0].text)
+        
+        return direction, width, names
     
-    def _parse_ports(self, port_list: str, module_content: str) -> List[Port]:
-        """Enhanced port parsing that handles both ANSI and traditional styles"""
-        ports = []
-        port_info = {}  # port_name -> Port
+    def _parse_ports(self, header_tokens: List[Token], body_declarations: List[List[Token]]) -> List[Port]:
+        """Build the port list from ANSI header declarations or non-ANSI body declarations"""
+        items = split_tokens(header_tokens)
+        
+        # ANSI style: directions in the module header
+        if any(item[0].text in self.DIRECTIONS for item in items):
+            ports = []
+            current_direction = None
+            current_width = None
+            
+            for item in items:
+                direction, width, names = self._parse_declaration(item)
+                if direction:
+                    current_direction = direction
+                    current_width = width
+                elif not current_direction:
+                    continue
+                elif width:
+                    current_width = width
+                
+                for port_name in names[:1]:
+                    ports.append(Port(name=port_name, direction=current_direction, width=current_width))
+            
+            return ports
         
-        # First, try to parse ANSI-style ports (ports with directions in module header)
-        ansi_ports = self._parse_ansi_ports(port_list)
-        if ansi_ports:
-            return ansi_ports
+        # Non-ANSI style: names in the header, declarations in the body
+        port_info = {}  # port_name -> Port
+        for declaration in body_declarations:
+            direction, width, names = self._parse_declaration(declaration)
+            for port_name in names:
+                port_info[port_name] = Port(name=port_name, direction=direction, width=width)
         
-        # If not ANSI style, parse traditional style
-        # Step 1: Get port names from module declaration
         port_names = []
-        if port_list.strip():
-            # Remove any existing direction/width info and extract just names
-            clean_port_list = re.sub(r'(input|output|inout)\s*(\[.*?\])?\s*', '', port_list)
-            port_names = [p.strip() for p in clean_port_list.split(',') if p.strip()]
-        
-        # Step 2: Find port declarations in module body
-        # Traditional style declarations
-        traditional_matches = self.traditional_port_pattern.findall(module_content)
-        for direction, width, port_names_str in traditional_matches:
-            port_names_list = [p.strip() for p in port_names_str.split(',')]
-            for port_name in port_names_list:
-                if port_name:
-                    port_info[port_name] = Port(
-                        name=port_name, 
-                        direction=direction, 
-                        width=width if width else None
-                    )
+        for item in items:
+            port_names.extend(self._parse_declaration(item)[2][:1])
         
-        # Step 3: Create ports list maintaining order from module declaration
-        if port_names:
-            for port_name in port_names:
-                if port_name in port_info:
-                    ports.append(port_info[port_name])
-                else:
-                    # Default to input if not found in declarations
-                    ports.append(Port(name=port_name, direction='input', width=None))
-        else:
+        if not port_names:
             # If no port list, just use what we found in declarations
-            ports = list(port_info.values())
+            return list(port_info.values())
         
-        return ports
+        # Default to input if not found in declarations
+        return [port_info.get(port_name, Port(name=port_name, direction='input', width=None))
+                for port_name in port_names]
+
+
+class ModuleLibrary:
+    """Index of the modules declared in each Verilog file
     
-    def _parse_ansi_ports(self, port_list: str) -> List[Port]:
-        """Parse ANSI-style port declarations"""
-        if not port_list.strip():
-            return []
+    Maps file -> module name -> ModuleHeader (offsets, ports and raw parameter
+    declarations).  A file is read and scanned on first touch and served from
+    memory afterwards.  refresh() starts a new run: each cached file is then
+    re-checked once against its mtime and size before being reused.
+    """
+    
+    def __init__(self, parser: 'VerilogParser' = None, cache: 'ParseCache' = None):
+        self.parser = parser or VerilogParser()
+        self.cache = cache  # optional persistent cache shared between runs
+        self._files = {}  # absolute path -> (stat signature, {module name -> ModuleHeader})
+        self._checked = set()  # paths validated since the last refresh()
+    
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return os.path.abspath(file_path)
+    
+    @staticmethod
+    def _signature(file_path: str) -> Tuple[int, int]:
+        stat = os.stat(file_path)
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def refresh(self):
+        """Re-validate cached files against the file system on their next use"""
+        self._checked.clear()
+    
+    def invalidate(self, file_path: str = None):
+        """Drop one file (or everything) from the index"""
+        if file_path is None:
+            self._files.clear()
+            self._checked.clear()
+        else:
+            key = self._key(file_path)
+            self._files.pop(key, None)
+            self._checked.discard(key)
+    
+    def get_modules(self, file_path: str) -> Dict[str, ModuleHeader]:
+        """Return all modules declared in a file, keyed by name in declaration order"""
+        key = self._key(file_path)
+        entry = self._files.get(key)
         
-        ports = []
+        if entry is not None and key in self._checked:
+            return entry[1]
         
-        # Check if this looks like ANSI style (contains direction keywords)
-        if not re.search(r'(input|output|inout)', port_list):
-            return []
+        try:
+            signature = self._signature(file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Verilog file not found: {file_path}")
         
-        # Split by commas, but be careful with brackets
-        port_parts = self._split_port_list(port_list)
+        if entry is None or entry[0] != signature:
+            entry = (signature, self._load_modules(file_path, signature))
+            self._files[key] = entry
         
-        current_direction = None
-        current_width = None
+        self._checked.add(key)
+        return entry[1]
+    
+    def _load_modules(self, file_path: str, signature: Tuple[int, int]) -> Dict[str, ModuleHeader]:
+        """Load module headers from the persistent cache, or scan the file"""
+        if self.cache is not None:
+            modules = self.cache.lookup(file_path, signature)
+            if modules is not None:
+                return modules
+        
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        
+        digest = None
+        if self.cache is not None:
+            # Same content under a new mtime (e.g. a fresh checkout) is still a hit
+            digest = hashlib.sha256(raw).hexdigest()
+            modules = self.cache.lookup(file_path, signature, digest)
+            if modules is not None:
+                return modules
+        
+        modules = {}
+        for header in self.parser.scan_modules(raw.decode('utf-8', errors='replace')):
+            # First declaration wins, as with a sequential search
+            modules.setdefault(header.name, header)
+        
+        if self.cache is not None:
+            self.cache.store(file_path, signature, digest, modules)
+        
+        return modules
+    
+    def prefetch(self, file_paths: List[str], max_workers: Optional[int] = None):
+        """Read and scan files concurrently so that later get_modules() calls are served from memory
         
-        for part in port_parts:
-            part = part.strip()
-            if not part:
+        Only the I/O and scanning run on the thread pool; results are installed in
+        input order on the calling thread.  Files that are missing or fail to scan
+        are skipped here and raise as usual when they are looked up.
+        """
+        pending = []
+        for file_path in dict.fromkeys(file_paths):
+            key = self._key(file_path)
+            if key in self._checked:
+                continue
+            try:
+                signature = self._signature(file_path)
+            except OSError:
                 continue
+            entry = self._files.get(key)
+            if entry is not None and entry[0] == signature:
+                self._checked.add(key)
+                continue
+            pending.append((key, file_path, signature))
+        
+        if len(pending) < 2:
+            return  # nothing to overlap; get_modules() loads it on demand
+        
+        def load(item):
+            key, file_path, signature = item
+            try:
+                return self._load_modules(file_path, signature)
+            except Exception:
+                return None
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            loaded = list(pool.map(load, pending))
+        
+        for (key, file_path, signature), modules in zip(pending, loaded):
+            if modules is not None:
+                self._files[key] = (signature, modules)
+                self._checked.add(key)
+    
+    def snapshot(self) -> Dict:
+        """Return a copy of the file index, e.g. to seed worker processes; entries must be treated as read-only"""
+        return dict(self._files)
+    
+    def preload(self, index: Dict):
+        """Seed the index from snapshot(); entries are still checked against mtime and size before use"""
+        self._files.update(index)
+    
+    def get_module(self, file_path: str, module_name: str = None) -> Optional[ModuleHeader]:
+        """Return a named module, or the first module in the file if no name is given"""
+        modules = self.get_modules(file_path)
+        if module_name:
+            return modules.get(module_name)
+        return next(iter(modules.values()), None)
+
+
+class SearchPath:
+    """File name index over the directories searched for instance Verilog files
+    
+    Bare file names are looked up in the current directory, then the search
+    directories, then the script directory and the parent of the current
+    directory.  Each directory is listed once, on the first lookup, so later
+    lookups are dict hits; a new run starts with a new SearchPath.  A name
+    found in several search directories is an error rather than a silent pick.
+    Paths with a directory part are checked against the same fixed locations
+    as before, without the search directories.
+    """
+    
+    def __init__(self, search_paths: Tuple[str, ...] = ()):
+        self.search_paths = tuple(search_paths)
+        self._index = None  # file name -> [(group, path)] in search order
+    
+    def _fixed_dirs(self) -> Tuple[str, str]:
+        return (os.path.dirname(os.path.abspath(__file__)), os.path.dirname(os.getcwd()))
+    
+    def _build(self):
+        script_dir, parent_dir = self._fixed_dirs()
+        groups = [('cwd', [os.curdir]), ('search', list(self.search_paths)),
+                  ('script', [script_dir]), ('parent', [parent_dir])]
+        
+        index = {}
+        listed = set()
+        for group, directories in groups:
+            for directory in directories:
+                key = os.path.realpath(directory)
+                if key in listed:
+                    continue  # the same directory reached twice is not ambiguous
+                listed.add(key)
+                try:
+                    with os.scandir(directory) as entries:
+                        for entry in entries:
+                            if entry.is_file():
+                                path = entry.name if directory == os.curdir else os.path.join(directory, entry.name)
+                                index.setdefault(entry.name, []).append((group, path))
+                except OSError:
+                    continue  # missing or unreadable directories simply contribute nothing
+        self._index = index
+    
+    def resolve(self, file_path: str) -> Optional[str]:
+        """Return the path the file is found at, or None; raise AmbiguousFileError for duplicate search matches"""
+        if os.path.isabs(file_path) or os.path.dirname(file_path):
+            for base in ('',) + self._fixed_dirs():
+                candidate = os.path.join(base, file_path) if base else file_path
+                if os.path.exists(candidate):
+                    return candidate
+            return None
+        
+        if self._index is None:
+            self._build()
+        
+        matches = self._index.get(file_path)
+        if not matches:
+            return None
+        
+        group, path = matches[0]
+        if group == 'search':
+            duplicates = [other for other_group, other in matches if other_group == 'search']
+            if len(duplicates) > 1:
+                raise AmbiguousFileError(f"Verilog file '{file_path}' found in several search directories: "
+                                         f"{', '.join(duplicates)}")
+        return path
+
+
+def _umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# Mode open() would give a new file; read once at import, before any thread can change the umask
+_NEW_FILE_MODE = 0o666 & ~_umask()
+
+
+def _temp_file_beside(path: str) -> Tuple[int, str]:
+    """Create a uniquely named temporary file in the directory of path
+    
+    Names from mkstemp never collide, not even between threads of one process
+    (GUI requests, the daemon) writing the same target.
+    """
+    directory, name = os.path.split(path)
+    return tempfile.mkstemp(prefix=f".{name}.", suffix='.tmp', dir=directory or '.')
+
+
+def _replace_file(temp_path: str, path: str):
+    """Rename temp_path over path, keeping the mode of an existing target"""
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = _NEW_FILE_MODE  # mkstemp creates 0600
+    os.chmod(temp_path, mode)
+    os.replace(temp_path, path)
+
+
+class ParseCache:
+    """Persistent on-disk cache of scanned module headers
+    
+    One JSON entry per Verilog file, keyed by absolute path and validated by
+    mtime and size, falling back to the SHA-256 of the file content.  Entry
+    mtimes record last use; once the cache grows past max_bytes the least
+    recently used entries are evicted.
+    """
+    
+    VERSION = 1  # bump when the scanner or entry format changes
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._total_bytes = None  # computed on first store
+        self._lock = threading.Lock()  # store() may be called from the library's prefetch threads
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def _entry_path(self, file_path: str) -> str:
+        key = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def lookup(self, file_path: str, signature: Tuple[int, int], digest: str = None) -> Optional[Dict[str, ModuleHeader]]:
+        """Return cached module headers if the entry matches the file
+        
+        Matches on (mtime, size); if digest is given, an entry with the same
+        content hash also matches and is updated to the new signature.
+        """
+        entry_path = self._entry_path(file_path)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if entry.get('version') != self.VERSION or entry.get('path') != os.path.abspath(file_path):
+            return None
+        
+        if [entry.get('mtime_ns'), entry.get('size')] == list(signature):
+            self._touch(entry_path)
+        elif digest is not None and entry.get('sha256') == digest:
+            entry['mtime_ns'], entry['size'] = signature
+            self._write_entry(entry_path, entry)
+        else:
+            return None
+        
+        modules = {}
+        for module_data in entry['modules']:
+            header = ModuleHeader(
+                name=module_data['name'],
+                ports=[Port(name=name, direction=direction, width=width)
+                       for name, direction, width in module_data['ports']],
+                parameters=module_data['parameters'],
+                start=module_data['start'],
+                end=module_data['end']
+            )
+            modules[header.name] = header
+        return modules
+    
+    def store(self, file_path: str, signature: Tuple[int, int], digest: str, modules: Dict[str, ModuleHeader]):
+        """Write the module headers of a freshly scanned file"""
+        entry = {
+            'version': self.VERSION,
+            'path': os.path.abspath(file_path),
+            'mtime_ns': signature[0],
+            'size': signature[1],
+            'sha256': digest,
+            'modules': [
+                {
+                    'name': header.name,
+                    'start': header.start,
+                    'end': header.end,
+                    'parameters': header.parameters,
+                    'ports': [[port.name, port.direction, port.width] for port in header.ports]
+                }
+                for header in modules.values()
+            ]
+        }
+        
+        entry_path = self._entry_path(file_path)
+        with self._lock:
+            try:
+                old_size = os.path.getsize(entry_path)
+            except OSError:
+                old_size = 0
             
-            # Check for direction change
-            # First try to match with wire/reg keyword as separate word
-            direction_match = re.match(r'(input|output|inout)\s+(wire|reg)\s+(\[.*?\])?\s*(.+)', part)
-            if direction_match:
-                current_direction = direction_match.group(1)
-                wire_reg_type = direction_match.group(2)  # This is the wire/reg keyword, not part of port name
-                current_width = direction_match.group(3)
-                remaining = direction_match.group(4)
-                
-                # Extract port names from remaining part
-                port_names = [p.strip() for p in remaining.split(',') if p.strip()]
-                for port_name in port_names:
-                    ports.append(Port(name=port_name, direction=current_direction, width=current_width))
+            new_size = self._write_entry(entry_path, entry)
+            
+            if self._total_bytes is None:
+                self._total_bytes = self._entry_sizes_total()
             else:
-                # Try to match without wire/reg keyword
-                direction_match = re.match(r'(input|output|inout)\s+(\[.*?\])?\s*(.+)', part)
-                if direction_match:
-                    current_direction = direction_match.group(1)
-                    current_width = direction_match.group(2)
-                    remaining = direction_match.group(3)
-                    
-                    # Extract port names from remaining part
-                    port_names = [p.strip() for p in remaining.split(',') if p.strip()]
-                    for port_name in port_names:
-                        ports.append(Port(name=port_name, direction=current_direction, width=current_width))
-                else:
-                    # No direction keyword, use current direction
-                    if current_direction:
-                        port_names = [p.strip() for p in part.split(',') if p.strip()]
-                        for port_name in port_names:
-                            ports.append(Port(name=port_name, direction=current_direction, width=current_width))
-        
-        return ports
+                self._total_bytes += new_size - old_size
+            
+            if self._total_bytes > self.max_bytes:
+                self.prune()
     
-    def _split_port_list(self, port_list: str) -> List[str]:
-        """Split port list by commas, respecting brackets"""
-        parts = []
-        current = ""
-        bracket_depth = 0
-        
-        for char in port_list:
-            if char == '[':
-                bracket_depth += 1
-            elif char == ']':
-                bracket_depth -= 1
-            elif char == ',' and bracket_depth == 0:
-                parts.append(current.strip())
-                current = ""
+    def prune(self):
+        """Evict least recently used entries until the cache fits its budget"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
                 continue
-            
-            current += char
+            entry_path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(entry_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
         
-        if current.strip():
-            parts.append(current.strip())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+            except OSError:
+                continue
+            total -= size
         
-        return parts
+        self._total_bytes = total
+    
+    def _entry_sizes_total(self) -> int:
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                try:
+                    total += os.path.getsize(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+        return total
+    
+    def _touch(self, entry_path: str):
+        """Mark an entry as recently used"""
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+    
+    def _write_entry(self, entry_path: str, entry: Dict) -> int:
+        """Atomically write an entry and return its size in bytes"""
+        data = json.dumps(entry).encode('utf-8')
+        temp_path = None
+        try:
+            fd, temp_path = _temp_file_beside(entry_path)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            _replace_file(temp_path, entry_path)
+        except OSError:
+            # The cache is an optimization only; never fail a run because of it
+            if temp_path:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            return 0
+        return len(data)
+
+
+class BlockCache:
+    """Instance blocks of the previous run of one wrapper, for incremental regeneration
+    
+    Stored as JSON next to the output file (<output>.state).  Each entry holds
+    an instance's block text with the unconnected ports and warnings found
+    while generating it, keyed by instance name and validated by a fingerprint
+    of everything the block depends on: module ports, parameters and the
+    connections touching the instance.  Only entries used or regenerated in
+    the current run are saved.
+    """
+    
+    VERSION = 1  # bump when the instance block format or the fingerprint changes
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.previous = self._load()
+        self.current = {}
+        self.hits = 0
+    
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(state, dict) or state.get('version') != self.VERSION:
+            return {}
+        return state.get('instances', {})
+    
+    @staticmethod
+    def fingerprint(*parts) -> str:
+        return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    
+    def get(self, instance_name: str, fingerprint: str) -> Optional[Dict]:
+        """Return the previous entry for the instance if its fingerprint still matches"""
+        entry = self.previous.get(instance_name)
+        if entry is None or entry.get('fingerprint') != fingerprint:
+            return None
+        self.hits += 1
+        self.current[instance_name] = entry
+        return entry
+    
+    def put(self, instance_name: str, fingerprint: str, text: str,
+            unconnected: List[Tuple[str, str]], warnings: List[Tuple[str, str, str]]):
+        """Record a freshly generated block"""
+        self.current[instance_name] = {
+            'fingerprint': fingerprint,
+            'text': text,
+            'unconnected': [list(item) for item in unconnected],
+            'warnings': [list(item) for item in warnings]
+        }
+    
+    def save(self):
+        """Atomically replace the state file with this run's entries"""
+        temp_path = None
+        try:
+            fd, temp_path = _temp_file_beside(self.path)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'version': self.VERSION, 'instances': self.current}))  # one-shot C encoder
+            _replace_file(temp_path, self.path)
+        except OSError:
+            # Losing the state only costs a full regeneration next time
+            if temp_path:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
 
 
 class ConfigParser:
@@ -349,7 +1782,8 @@ class ConfigParser:
             'instances': [],
             'top_ports': [],
             'instance_connections': [],
-            'instance_to_top': {}
+            'instance_to_top': {},
+            'config_files': []  # files actually read, for dependency tracking
         }
         
         import os
@@ -359,6 +1793,7 @@ class ConfigParser:
         if not os.path.exists(top_module_file):
             top_module_file = os.path.join(config_dir, 'top_module.txt')
         if os.path.exists(top_module_file):
+            config['config_files'].append(top_module_file)
             top_module_config = self._parse_top_module(top_module_file)
             config['top_module'] = top_module_config['name']
             config['top_module_parameters'] = top_module_config['parameters']
@@ -370,6 +1805,7 @@ class ConfigParser:
         if not os.path.exists(instances_file):
             instances_file = os.path.join(config_dir, 'instances.txt')
         if os.path.exists(instances_file):
+            config['config_files'].append(instances_file)
             config['instances'] = self._parse_instances(instances_file)
         
         # Parse top ports
@@ -377,6 +1813,7 @@ class ConfigParser:
         if not os.path.exists(top_ports_file):
             top_ports_file = os.path.join(config_dir, 'top_ports.txt')
         if os.path.exists(top_ports_file):
+            config['config_files'].append(top_ports_file)
             config['top_ports'] = self._parse_top_ports(top_ports_file)
         
         # Parse instance to top mappings
@@ -384,6 +1821,7 @@ class ConfigParser:
         if not os.path.exists(instance_to_top_file):
             instance_to_top_file = os.path.join(config_dir, 'instance_to_top.txt')
         if os.path.exists(instance_to_top_file):
+            config['config_files'].append(instance_to_top_file)
             config['instance_to_top'] = self._parse_instance_to_top(instance_to_top_file)
         
         # Parse instance connections
@@ -391,6 +1829,7 @@ class ConfigParser:
         if not os.path.exists(instance_connections_file):
             instance_connections_file = os.path.join(config_dir, 'instance_connections.txt')
         if os.path.exists(instance_connections_file):
+            config['config_files'].append(instance_connections_file)
             config['instance_connections'] = self._parse_instance_connections(instance_connections_file)
         
         # Parse instance port exports
@@ -398,10 +1837,14 @@ class ConfigParser:
         if not os.path.exists(instance_export_port_file):
             instance_export_port_file = os.path.join(config_dir, 'instance_export_port.txt')
         if os.path.exists(instance_export_port_file):
+            config['config_files'].append(instance_export_port_file)
             config['instance_export_ports'] = self._parse_instance_export_ports(instance_export_port_file)
         else:
             config['instance_export_ports'] = []
         
+        # Netlist IR used by validation, generation and reports
+        config['design'] = Design.from_config(config)
+        
         return config
     
     def _parse_top_module(self, file_path: str) -> Dict:
@@ -765,104 +2208,442 @@ class ConfigParser:
         
         config['instances'] = list(instances.values())
         return config
+    
+    def parse_batch_manifest(self, file_path: str) -> List[str]:
+        """Parse a batch manifest: one configuration directory per line, relative to the manifest"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Batch manifest not found: {file_path}")
+        
+        base_dir = os.path.dirname(file_path)
+        config_dirs = []
+        for line in lines:
+            line = line.strip()
+            
+            # Skip empty lines and comments
+            if not line or line.startswith('#'):
+                continue
+            
+            config_dirs.append(os.path.join(base_dir, os.path.expanduser(line)))
+        
+        return config_dirs
+
+
+class WrapperEmitter:
+    """Streams generated wrapper text to one or more sinks
+    
+    Blocks (module header and declarations, one block per instance, the
+    closing endmodule) are written to every sink as soon as they are produced
+    and separated by a newline, so memory use is bounded by the largest block
+    rather than by the size of the whole wrapper.
+    """
+    
+    def __init__(self, sinks: List):
+        self.sinks = list(sinks)
+        self._started = False
+    
+    def write_block(self, block: str):
+        """Write one block of lines to every sink"""
+        if self._started:
+            block = "\n" + block
+        self._started = True
+        for sink in self.sinks:
+            sink.write(block)
+
+
+class OutputFile:
+    """Output file sink that only replaces the file when its content changes
+    
+    Text is written to a temporary file next to the target while its SHA-256
+    is computed.  On close the digest is compared with the file on disk: an
+    identical file is left untouched (keeping its mtime for make and friends),
+    otherwise the temporary file takes over the target's mode and is renamed
+    over it atomically.  Leaving the with-block through an exception discards
+    the temporary file.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.changed = None  # set on close: True if the file was (re)written
+        fd, self._temp_path = _temp_file_beside(path)
+        self._file = os.fdopen(fd, 'wb')
+        self._digest = hashlib.sha256()
+    
+    def write(self, text: str):
+        data = text.encode('utf-8')
+        self._digest.update(data)
+        self._file.write(data)
+    
+    @property
+    def status(self) -> str:
+        return "written" if self.changed else "unchanged"
+    
+    def _matches_target(self) -> bool:
+        try:
+            if os.path.getsize(self.path) != self._file.tell():
+                return False
+            digest = hashlib.sha256()
+            with open(self.path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        except OSError:
+            return False
+        return digest.digest() == self._digest.digest()
+    
+    def close(self):
+        """Keep the new content if it differs from the target, otherwise drop it"""
+        unchanged = self._matches_target()
+        self._file.close()
+        if unchanged:
+            os.remove(self._temp_path)
+        else:
+            _replace_file(self._temp_path, self.path)
+        self.changed = not unchanged
+    
+    def discard(self):
+        """Drop the new content, leaving the target as it was"""
+        self._file.close()
+        try:
+            os.remove(self._temp_path)
+        except OSError:
+            pass
+    
+    def __enter__(self) -> 'OutputFile':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
 
 
 class WrapperGenerator:
     """Generates Verilog wrapper files"""
     
-    def __init__(self):
-        self.parser = VerilogParser()
+    # Parameter memo entries kept across runs, least recently used dropped first
+    PARAMETER_MEMO_LIMIT = 65536
+    
+    def __init__(self, cache: ParseCache = None, context: RunContext = None, parser: 'VerilogParser' = None):
+        self.parser = parser or VerilogParser()  # a shared parser keeps its module library warm across generators
+        if cache is not None:
+            self.parser.library.cache = cache  # optional persistent parse cache
         self.config_parser = ConfigParser()
         self.error_reporter = ErrorReporter()
         self.debug_info = {}  # Store debug information for each step
+        self.context = context or RunContext()  # report directory for runs without their own context
+        self.reports = None  # ReportManager of the run in progress
+        self._search_path = None  # SearchPath of the run in progress, built on first lookup
+        self._block_cache = None  # BlockCache of the incremental run in progress
+        self.output_status = {}  # output file of the last run -> 'written' or 'unchanged'
+        self.input_files = []  # configuration and module files the last validated run read
+        self.unresolved_files = []  # instance file names the last validated run could not resolve to one file
+        self._parameter_memo = OrderedDict()  # (file, module, overrides) -> (module header, resolved parameters), LRU order
+        self._oversized_ports = {}  # (file, module, overrides) -> ports whose width exceeds the bit limit, per validation
     
     def generate_wrapper_from_spec(self, spec_file: str) -> str:
         """Generate wrapper Verilog code from input specification file"""
         config = self.config_parser.parse_input_spec(spec_file)
         return self.generate_wrapper(config)
     
-    def generate_wrapper_from_config(self, config_dir: str) -> str:
+    def generate_wrapper_from_config(self, config_dir: str, context: RunContext = None) -> str:
         """Generate wrapper Verilog code from configuration directory"""
+        buffer = io.StringIO()
+        if not self.write_wrapper_from_config(config_dir, sinks=[buffer], context=context):
+            return ""
+        return buffer.getvalue()
+    
+    def write_wrapper_from_config(self, config_dir: str, output_file: Optional[str] = None, sinks: List = (),
+                                  context: RunContext = None) -> bool:
+        """Generate the wrapper for a configuration directory, streaming it to the report directory, output_file and sinks
+        
+        Reports go to context.rpt_dir, or to the generator's own context when none is given.
+        An output_file naming an existing directory receives <top_module>.v.
+        Returns False when validation fails, in which case no wrapper is written.
+        """
+        with self._run_context(context), self._reporting():
+            return self._write_wrapper_from_config(config_dir, output_file, sinks)
+    
+    def check_config_directory(self, config_dir: str, context: RunContext = None) -> Dict:
+        """Validate a configuration directory without generating the wrapper; see check_config"""
+        config = self.config_parser.parse_config_directory(config_dir)
+        return self.check_config(config, context)
+    
+    def check_config(self, config: Dict, context: RunContext = None) -> Dict:
+        """Run the full configuration validation only and return its results
+        
+        No Verilog is emitted and no wrapper or debug report is written: the
+        context's report level is capped at 'errors', so at most the error
+        reports are written.
+        Returns valid, error and warning records (as in Error_report.jsonl) and the summary counts.
+        """
+        context = context or self.context
+        if context.wants_report('summary'):
+            context = replace(context, report_level='errors')
+        
+        with self._run_context(context), self._reporting():
+            self.debug_info = {}
+            self.parser.library.refresh()
+            valid = self._validate_configuration(config)
+        
+        return {
+            'valid': valid,
+            'errors': [asdict(error) for error in self.error_reporter.errors],
+            'warnings': [asdict(warning) for warning in self.error_reporter.warnings],
+            'summary': self.error_reporter.summary()
+        }
+    
+    @contextlib.contextmanager
+    def _run_context(self, context: Optional[RunContext]):
+        """Use context for the duration of one run, then restore the generator's own"""
+        if context is None:
+            yield
+            return
+        
+        saved_context = self.context
+        self.context = context
+        try:
+            yield
+        finally:
+            self.context = saved_context
+    
+    @contextlib.contextmanager
+    def _reporting(self):
+        """Buffer the reports of one run and write them when it ends; nested runs share the outer buffer"""
+        if self.reports is not None:
+            yield
+            return
+        
+        self.reports = ReportManager(self.context)
+        self._search_path = None  # list the search directories afresh for every run
+        try:
+            yield
+        finally:
+            reports, self.reports = self.reports, None
+            self.error_reporter.record_stream = None  # the stream closes with this run
+            self.error_reporter.print_summary()
+            reports.flush()
+    
+    def _new_error_reporter(self) -> ErrorReporter:
+        """Create an error reporter with the current run's console settings"""
+        return ErrorReporter(quiet=self.context.quiet, message_limit=self.context.message_limit)
+    
+    def _open_report_stream(self, name: str, level: str):
+        """Return an open report file for records streamed during the current run, or None"""
+        if self.reports is None:
+            return None
+        return self.reports.open_stream(name, level)
+    
+    def _add_report(self, name: str, level: str, writer) -> bool:
+        """Queue writer(f) to produce a report file for this run; False if the report level excludes it"""
+        with self._reporting():
+            return self.reports.add(name, level, writer)
+    
+    def _write_wrapper_from_config(self, config_dir: str, output_file: Optional[str], sinks: List) -> bool:
+        """Body of write_wrapper_from_config, run under the active context"""
         # Clear previous debug info
         self.debug_info = {}
         
+        # Re-check cached module files against the file system for this run
+        self.parser.library.refresh()
+        
         # Parse configuration
         config = self.config_parser.parse_config_directory(config_dir)
         
         # Validate configuration before generating wrapper
         if not self._validate_configuration(config):
             print(f"\nValidation failed. Found {len(self.error_reporter.errors)} error(s) and {len(self.error_reporter.warnings)} warning(s).")
-            return ""
+            return False
+        
+        if output_file and os.path.isdir(output_file):
+            output_file = os.path.join(output_file, f"{config['top_module']}.v")
+        self.output_status = {}
         
-        # Generate wrapper and collect debug info
-        wrapper_code = self.generate_wrapper_advanced(config)
+        # Incremental runs splice in the unchanged instance blocks of the previous run
+        if self.context.incremental and output_file:
+            self._block_cache = BlockCache(f"{output_file}.state")
+        
+        # Stream the wrapper into the rpt copy and the requested outputs in one pass;
+        # files whose content did not change are left untouched
+        try:
+            output = None
+            with contextlib.ExitStack() as stack:
+                outputs = []
+                if self.context.wants_report('summary'):
+                    rpt_dir = self.context.ensure_rpt_dir()
+                    outputs.append(stack.enter_context(OutputFile(f"{rpt_dir}/06_final_wrapper.v")))
+                if output_file:
+                    output = stack.enter_context(OutputFile(output_file))
+                    outputs.append(output)
+                self.stream_wrapper_advanced(config, outputs + list(sinks))
+            if output is not None:
+                self.output_status[output_file] = output.status
+            
+            if self._block_cache is not None:
+                self._block_cache.save()
+                if not self.context.quiet:
+                    print(f"Incremental: reused {self._block_cache.hits} of "
+                          f"{len(config['design'].instances)} instance block(s)")
+        finally:
+            self._block_cache = None
         
         # Generate debug reports
         self._generate_debug_reports(config_dir)
         
-        # Save final wrapper code to rpt directory
-        import os
-        rpt_dir = "./rpt"
-        if not os.path.exists(rpt_dir):
-            os.makedirs(rpt_dir)
+        return True
+    
+    def generate_batch(self, config_dirs: List[str], output_dir: str, jobs: int = 1) -> Dict[str, bool]:
+        """Generate one wrapper per configuration directory, sharing the module library and parameter memo
+        
+        Each run gets its own directory under output_dir, mirroring the layout of
+        the configuration directories, holding <top_module>.v and its rpt/ reports.
+        With jobs > 1 the runs are spread over a process pool.  Console output and
+        the merged output_dir/Error_report.list follow input order either way.
+        Returns config directory -> success, in input order.
+        """
+        run_dirs = self._batch_run_dirs(config_dirs, output_dir)
+        labels = [f"[{index}/{len(config_dirs)}] {config_dir} -> {run_dirs[config_dir]}"
+                  for index, config_dir in enumerate(config_dirs, 1)]
         
-        with open(f"{rpt_dir}/06_final_wrapper.v", 'w') as f:
-            f.write(wrapper_code)
+        if jobs > 1 and len(config_dirs) > 1:
+            outcomes = self._generate_batch_parallel(config_dirs, run_dirs, labels, jobs)
+        else:
+            outcomes = (self._run_batch_entry(config_dir, run_dirs[config_dir], label)
+                        for config_dir, label in zip(config_dirs, labels))
         
-        return wrapper_code
+        results = {}
+        merged_reporter = ErrorReporter()
+        for config_dir, (ok, reporter) in zip(config_dirs, outcomes):
+            results[config_dir] = ok
+            merged_reporter.merge(reporter, config_dir)
+        
+        if self.context.wants_report('errors'):
+            os.makedirs(output_dir, exist_ok=True)
+            merged_reporter.generate_error_report(output_dir)
+        
+        failed = [config_dir for config_dir, ok in results.items() if not ok]
+        print(f"\nBatch complete: {len(results) - len(failed)} succeeded, {len(failed)} failed.")
+        for config_dir in failed:
+            print(f"  FAILED: {config_dir}")
+        
+        return results
+    
+    def _run_batch_entry(self, config_dir: str, run_dir: str, label: str) -> Tuple[bool, ErrorReporter]:
+        """Generate one batch entry into run_dir, returning its success and error reporter"""
+        print(f"\n{label}")
+        self.error_reporter = self._new_error_reporter()
+        
+        try:
+            os.makedirs(run_dir, exist_ok=True)
+            ok = self.write_wrapper_from_config(config_dir, run_dir, context=replace(self.context, rpt_dir=os.path.join(run_dir, "rpt")))
+        except Exception as e:
+            self.error_reporter.add_error("GENERATION_FAILED", str(e), config_dir)
+            ok = False
+        
+        return ok, self.error_reporter
+    
+    def _generate_batch_parallel(self, config_dirs: List[str], run_dirs: Dict[str, str], labels: List[str],
+                                 jobs: int) -> Iterator[Tuple[bool, ErrorReporter]]:
+        """Run batch entries on a process pool, yielding outcomes and replaying their console output in input order"""
+        # Scan every referenced file once here; workers start from a copy of this index instead of re-parsing
+        index = self.prebuild_library(config_dirs)
+        
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker, initargs=(index, self.context)) as pool:
+            futures = [pool.submit(_run_batch_worker, config_dir, run_dirs[config_dir], label)
+                       for config_dir, label in zip(config_dirs, labels)]
+            for future in futures:
+                ok, output, reporter = future.result()
+                sys.stdout.write(output)
+                yield ok, reporter
+    
+    def prebuild_library(self, config_dirs: List[str]) -> Dict:
+        """Scan every Verilog file referenced by the configurations and return the module library index"""
+        for config_dir in config_dirs:
+            try:
+                config = self.config_parser.parse_config_directory(config_dir)
+            except Exception:
+                continue  # reported by the run itself
+            
+            for node in config['design'].instances:
+                try:
+                    file_path = self._resolve_file_path(node.file)
+                    if file_path:
+                        self.parser.library.get_modules(file_path)
+                except Exception:
+                    pass  # reported by the run itself
+        
+        return self.parser.library.snapshot()
+    
+    @staticmethod
+    def _batch_run_dirs(config_dirs: List[str], output_dir: str) -> Dict[str, str]:
+        """Map each configuration directory to its own run directory under output_dir"""
+        paths = [os.path.abspath(config_dir) for config_dir in config_dirs]
+        
+        # Keep the last component of the common prefix so a single directory still gets a named run directory
+        root = os.path.dirname(os.path.commonpath(paths)) if paths else ""
+        
+        run_dirs = {}
+        for config_dir, path in zip(config_dirs, paths):
+            run_dirs[config_dir] = os.path.join(output_dir, os.path.relpath(path, root))
+        return run_dirs
     
     def generate_wrapper_advanced(self, config: Dict) -> str:
         """Generate wrapper Verilog code from advanced configuration"""
-        top_module_name = config.get('top_module', 'top_wrapper')
-        top_module_parameters = config.get('top_module_parameters', {})
-        instances_config = config.get('instances', [])
-        top_ports = config.get('top_ports', [])
-        instance_to_top_config = config.get('instance_to_top', {})
-        instance_connections = config.get('instance_connections', [])
-        instance_export_ports = config.get('instance_export_ports', [])
+        return "\n".join(self._emit_wrapper_advanced(config))
+    
+    def stream_wrapper_advanced(self, config: Dict, sinks: List):
+        """Generate wrapper Verilog code, writing each block to every sink as it is produced"""
+        emitter = WrapperEmitter(sinks)
+        for block in self._emit_wrapper_advanced(config):
+            emitter.write_block(block)
+    
+    def _emit_wrapper_advanced(self, config: Dict) -> Iterator[str]:
+        """Prepare instances and top ports, then return the block iterator for the wrapper"""
+        design = self._get_design(config)
+        top_ports = design.top_ports
         
         # Parse all modules and create instances
         instances = []
         parsed_modules = []
         
-        for inst_config in instances_config:
-            # Parse module with specific module name if provided
-            target_module_name = inst_config.get('module_name')
-            module = self.parser.parse_module(inst_config['file'], target_module_name)
-            instance_name = inst_config['instance_name']
-            parameters = inst_config.get('parameters', {})
+        # Group instance_to_top by instance name
+        port_mappings = {}
+        for net in design.top_nets:
+            if net.source.instance is not None:
+                port_spec = net.source.port + net.source.range if net.source.range else net.source.port
+                port_mappings.setdefault(net.source.instance, {})[port_spec] = str(net.target)
+        
+        for node in design.instances:
+            # Reuse the module parsed during validation, otherwise look it up in the module library
+            module = node.module
+            if module is None:
+                module = self.parser.parse_module(node.file, node.module_name)
             
             # Collect module parsing info for debug report
-            module_params = self._extract_parameters_from_module(inst_config['file'])
+            module_params = self._get_module_parameters(node.file, module.name)
             parsed_modules.append({
                 'name': module.name,
-                'file': inst_config['file'],
+                'file': node.file,
                 'parameters': module_params,
                 'ports': module.ports
             })
             
-            # Build port mapping from instance_to_top
-            port_mapping = {}
-            for inst_port, top_port in instance_to_top_config.items():
-                if inst_port.startswith(f"{instance_name}."):
-                    port_name = inst_port.split('.', 1)[1]
-                    port_mapping[port_name] = top_port
+            # Port mapping from instance_to_top
+            port_mapping = dict(port_mappings.get(node.name, {}))
             
-            instance = Instance(module=module, instance_name=instance_name, parameters=parameters, port_mapping=port_mapping)
+            instance = Instance(module=module, instance_name=node.name, parameters=node.parameters, port_mapping=port_mapping)
             instances.append(instance)
         
         # Store parsed modules info for debug report
         self.debug_info['parsed_modules'] = parsed_modules
         
         # Store connection info for debug report
-        self.debug_info['connections'] = {
-            'instance_to_top': instance_to_top_config,
-            'instance_connections': instance_connections,
-            'export_ports': instance_export_ports
-        }
+        self.debug_info['design'] = design
         
         # Add exported ports to top_ports, avoiding duplicates
-        exported_top_ports = self._generate_exported_ports(instances, instance_export_ports)
+        exported_top_ports = self._generate_exported_ports(instances, design.exports)
         
         # Create a set of existing port names to avoid duplicates
         existing_port_names = {port.name for port in top_ports}
@@ -883,11 +2664,22 @@ class WrapperGenerator:
                 )
         
         # Generate wrapper code
-        wrapper_code = self._generate_wrapper_code_advanced(top_module_name, top_module_parameters, instances, all_top_ports, instance_connections, instance_to_top_config, instance_export_ports)
-        return wrapper_code
+        return self._emit_wrapper_code_advanced(design.top_module, design.top_parameters, instances, all_top_ports, design)
+    
+    def _get_design(self, config: Dict) -> Design:
+        """Return the configuration's netlist IR, building it once for hand-made configs"""
+        design = config.get('design')
+        if design is None:
+            design = config['design'] = Design.from_config(config)
+        return design
     
     def generate_wrapper(self, config: Dict) -> str:
         """Generate wrapper Verilog code from configuration"""
+        with self._reporting():
+            return self._generate_wrapper(config)
+    
+    def _generate_wrapper(self, config: Dict) -> str:
+        """Body of generate_wrapper, run with buffered reports"""
         top_module_name = config.get('top_module', 'top_wrapper')
         instances_config = config.get('instances', [])
         
@@ -921,82 +2713,107 @@ class WrapperGenerator:
         wrapper_code = self._generate_wrapper_code(top_module_name, instances, all_top_ports)
         return wrapper_code
     
-    def _generate_exported_ports(self, instances: List[Instance], instance_export_ports: List[Dict]) -> List[Port]:
+    def _generate_exported_ports(self, instances: List[Instance], exports: List[Net]) -> List[Port]:
         """Generate Port objects for exported instance ports"""
         exported_ports = []
+        instances_by_name = {}
+        for instance in instances:
+            instances_by_name.setdefault(instance.instance_name, instance)
         
-        for export_config in instance_export_ports:
-            instance_name = export_config['instance_name']
-            port_name = export_config['port_name']
-            export_name = export_config['export_name']
-            
+        for export in exports:
             # Find the corresponding instance and port
-            for instance in instances:
-                if instance.instance_name == instance_name:
-                    for port in instance.module.ports:
-                        if port.name == port_name:
-                            # Get instance-specific parameter values for width substitution
-                            module_params = self._extract_parameters_from_module(instance.module.file_path)
-                            instance_params = module_params.copy()
-                            if instance.parameters:
-                                for param_name, param_value in instance.parameters.items():
-                                    instance_params[param_name] = param_value
-                            instance_params = self._resolve_parameter_dependencies(instance_params)
-                            
-                            # Substitute parameter values in width
-                            substituted_width = self._substitute_parameters(port.width, instance_params) if port.width else None
-                            
-                            # Create new port with export name and substituted width
-                            exported_port = Port(
-                                name=export_name,
-                                direction=port.direction,
-                                width=substituted_width
-                            )
-                            exported_ports.append(exported_port)
-                            break
+            instance = instances_by_name.get(export.source.instance)
+            if instance is None:
+                continue
+            for port in instance.module.ports:
+                if port.name == export.source.port:
+                    # Get instance-specific parameter values for width substitution
+                    instance_params = self._get_instance_parameters(instance)
+                    
+                    # Substitute parameter values in width
+                    substituted_width = self._substitute_parameters(port.width, instance_params) if port.width else None
+                    
+                    # Create new port with export name and substituted width
+                    exported_port = Port(
+                        name=export.target.port,
+                        direction=port.direction,
+                        width=substituted_width
+                    )
+                    exported_ports.append(exported_port)
                     break
         
         return exported_ports
     
     def _validate_configuration(self, config: Dict) -> bool:
         """Validate the entire configuration and report errors"""
-        self.error_reporter = ErrorReporter()  # Reset error reporter
-        
-        # Validate instances
-        instances_config = config.get('instances', [])
-        valid_instances = []
-        
-        for inst_config in instances_config:
-            if self._validate_instance(inst_config):
-                valid_instances.append(inst_config)
-        
-        # Validate connections if no critical errors in instances
-        if not self.error_reporter.has_errors():
-            instance_to_top_config = config.get('instance_to_top', {})
-            instance_connections = config.get('instance_connections', [])
-            self._validate_connections(valid_instances, instance_to_top_config, instance_connections)
+        self.error_reporter = self._new_error_reporter()  # Reset error reporter
+        self.error_reporter.record_stream = self._open_report_stream("Error_report.jsonl", 'errors')
+        design = self._get_design(config)
+        
+        # Scan the distinct instance files concurrently; validation below then reads them from the library
+        file_paths = []
+        self.unresolved_files = []
+        for node in design.instances:
+            try:
+                file_path = self._resolve_file_path(node.file)
+            except AmbiguousFileError:
+                file_path = None  # reported by _validate_instance
+            file_paths.append(file_path)
+            if file_path is None:
+                self.unresolved_files.append(node.file)
+        self.parser.library.prefetch([file_path for file_path in file_paths if file_path])
+        
+        # Inputs of this run, for depfiles and --watch: config files, then each resolved module file once
+        self.input_files = list(config.get('config_files', []))
+        self.input_files.extend(dict.fromkeys(file_path for file_path in file_paths if file_path))
+        
+        # Top parameters may refer to each other; instance values are checked against their resolved values
+        top_parameters = self._resolve_parameter_dependencies_improved(design.top_parameters or {})
+        self._oversized_ports = {}
+        
+        # With an error limit, add_error raises as soon as the limit is reached
+        self.error_reporter.max_errors = self.context.max_errors
+        try:
+            # Validate instances
+            valid_instances = []
+            
+            for node in design.instances:
+                if self._validate_instance(node, top_parameters):
+                    valid_instances.append(node)
+            
+            # Validate connections if no critical errors in instances
+            if not self.error_reporter.has_errors():
+                self._validate_connections(valid_instances, design)
+        except ErrorLimitReached as e:
+            # Fast check: no reports for a validation that was cut short, and no stale error reports either
+            if self.reports is not None:
+                self.reports.discard(("Error_report.list", "Report_summary.json"))
+            print(f"\n{e} (error limit {self.context.max_errors}); remaining checks and reports skipped.")
+            return False
+        finally:
+            self.error_reporter.max_errors = None
         
-        # Generate error report
-        self.error_reporter.generate_error_report()
+        # Error report is written with the other reports when the run ends, so late warnings are included
+        if self._add_report("Error_report.list", 'errors', self.error_reporter.write_report):
+            self._add_report("Report_summary.json", 'errors', self._write_report_summary)
+            if not self.context.quiet:
+                print(f"\nError report saved to: {os.path.join(self.context.rpt_dir, 'Error_report.list')}")
         
         return not self.error_reporter.has_errors()
     
-    def _validate_instance(self, inst_config: Dict) -> bool:
+    def _validate_instance(self, node: InstanceNode, top_parameters: Dict[str, str] = None) -> bool:
         """Validate a single instance configuration"""
-        instance_name = inst_config.get('instance_name', '')
-        file_path = inst_config.get('file', '')
-        module_name = inst_config.get('module_name')
-        parameters = inst_config.get('parameters', {})
-        
-        config_line = f"{instance_name} | {file_path}"
-        if module_name:
-            config_line += f" | {module_name}"
-        if parameters:
-            param_str = ", ".join([f"{k}={v}" for k, v in parameters.items()])
-            config_line += f" | {param_str}"
+        file_path = node.file
+        module_name = node.module_name
+        parameters = node.parameters
+        config_line = node.config_line
         
         # Check if file exists - try multiple locations
-        resolved_file_path = self._resolve_file_path(file_path)
+        try:
+            resolved_file_path = self._resolve_file_path(file_path)
+        except AmbiguousFileError as e:
+            self.error_reporter.add_error("AMBIGUOUS_FILE", str(e), config_line)
+            return False
         if not resolved_file_path:
             self.error_reporter.add_error("FILE_NOT_FOUND", 
                                         f"Verilog file '{file_path}' does not exist", 
@@ -1004,18 +2821,16 @@ class WrapperGenerator:
             return False
         
         # Update the file path to the resolved path
-        inst_config['file'] = resolved_file_path
+        node.file = resolved_file_path
         
         # Try to parse the module
         try:
             module = self.parser.parse_module(resolved_file_path, module_name)
-            inst_config['_parsed_module'] = module  # Cache parsed module
+            node.module = module  # Cache parsed module
             
             # Validate parameters
             if parameters:
-                self._validate_parameters(module, parameters, config_line)
-            
-            return True
+                self._validate_parameters(module, parameters, config_line, top_parameters)
             
         except ValueError as e:
             if module_name:
@@ -1032,51 +2847,72 @@ class WrapperGenerator:
                                         f"Error parsing '{file_path}': {str(e)}", 
                                         config_line)
             return False
+        
+        # Port widths with this instance's parameter values, evaluated once per module and parameter set
+        width_key = (module.file_path, module.name, tuple(sorted(parameters.items())))
+        oversized = self._oversized_ports.get(width_key)
+        if oversized is None:
+            instance_params = self._resolve_module_parameters(module.file_path, module.name, parameters)
+            oversized = self._oversized_ports[width_key] = [
+                port for port in module.ports
+                if port.width and self._bit_range_exceeds_limit(self._bit_range_bounds(port.width, instance_params))]
+        for port in oversized:
+            self._report_bit_range(f"Port '{node.name}.{port.name}'", port.width, config_line)
+        
+        return True
     
-    def _validate_parameters(self, module: Module, parameters: Dict[str, str], config_line: str):
+    def _validate_parameters(self, module: Module, parameters: Dict[str, str], config_line: str,
+                             top_parameters: Dict[str, str] = None):
         """Validate instance parameters against module"""
         # Extract module parameters from file
         try:
-            module_params = self._extract_parameters_from_module(module.file_path)
+            module_params = self._get_module_parameters(module.file_path, module.name)
+        except Exception:
+            return  # If we can't extract parameters, skip validation
+        
+        # Values may use the module's parameters and, taking precedence as the instantiating scope, the top's
+        bindings = dict(module_params)
+        bindings.update(top_parameters or {})
+        
+        for param_name, param_value in parameters.items():
+            if param_name not in module_params:
+                self.error_reporter.add_warning("PARAMETER_NOT_FOUND", 
+                                               f"Parameter '{param_name}' not found in module '{module.name}'", 
+                                               config_line)
             
-            for param_name, param_value in parameters.items():
-                if param_name not in module_params:
-                    self.error_reporter.add_warning("PARAMETER_NOT_FOUND", 
-                                                   f"Parameter '{param_name}' not found in module '{module.name}'", 
-                                                   config_line)
-                
-                # Validate parameter value format
-                try:
-                    # Try to evaluate if it's a numeric expression
-                    if re.match(r'^[\d\+\-\*\/\(\)\s]+$', param_value):
-                        eval(param_value)
-                except:
-                    self.error_reporter.add_warning("INVALID_PARAMETER_VALUE", 
-                                                   f"Parameter '{param_name}' has invalid value '{param_value}'", 
-                                                   config_line)
-        except:
-            pass  # If we can't extract parameters, skip validation
+            # Validate parameter value: any constant expression the evaluator accepts
+            try:
+                ConstantExpression.compile(param_value).evaluate(bindings)
+            except ValueError:
+                self.error_reporter.add_warning("INVALID_PARAMETER_VALUE", 
+                                               f"Parameter '{param_name}' has invalid value '{param_value}'", 
+                                               config_line)
     
-    def _validate_connections(self, instances: List[Dict], instance_to_top: Dict[str, str], instance_connections: List[Dict]):
+    def _validate_connections(self, instances: List[InstanceNode], design: Design):
         """Validate port connections"""
         # Build port lookup table
         port_lookup = {}  # instance.port -> Port object
         
-        for inst_config in instances:
-            if '_parsed_module' in inst_config:
-                module = inst_config['_parsed_module']
-                instance_name = inst_config['instance_name']
-                
-                for port in module.ports:
-                    port_key = f"{instance_name}.{port.name}"
+        for node in instances:
+            if node.module is not None:
+                for port in node.module.ports:
+                    port_key = f"{node.name}.{port.name}"
                     port_lookup[port_key] = port
         
+        # Constant slice bounds must stay within the bit limit
+        for net in design.top_nets + design.nets:
+            for ref in (net.source, net.target):
+                if ref.range and self._bit_range_exceeds_limit(ref.bounds or self._bit_range_bounds(ref.range, {})):
+                    self._report_bit_range(f"Slice of '{ref.key}'", ref.range, net.config_line)
+        
         # Validate instance-to-top connections
-        for inst_port, top_port in instance_to_top.items():
-            config_line = f"{inst_port} -> {top_port}"
+        for net in design.top_nets:
+            config_line = net.config_line
+            inst_port = str(net.source)
+            top_port = str(net.target)
             
-            # Extract base port name (without bit ranges)
-            base_inst_port = inst_port.split('[')[0]
+            # Base port name (without bit ranges)
+            base_inst_port = net.source.key
             
             if base_inst_port not in port_lookup:
                 self.error_reporter.add_error("PORT_NOT_FOUND", 
@@ -1087,21 +2923,21 @@ class WrapperGenerator:
             port = port_lookup[base_inst_port]
             
             # Check for special connections
-            if top_port in ['TIE0', 'TIE1', 'FLOAT']:
+            if net.target.is_special:
                 if port.direction != 'input':
                     self.error_reporter.add_error("INVALID_TIE_CONNECTION", 
                                                 f"Cannot tie {port.direction} port '{inst_port}' to '{top_port}'", 
                                                 config_line)
         
         # Validate instance-to-instance connections
-        for connection in instance_connections:
-            source = connection.get('source', '')
-            target = connection.get('target', '')
-            config_line = f"{source} -> {target}"
+        for net in design.nets:
+            source = str(net.source)
+            target = str(net.target)
+            config_line = net.config_line
             
-            # Extract base port names
-            base_source = source.split('[')[0]
-            base_target = target.split('[')[0]
+            # Base port names
+            base_source = net.source.key
+            base_target = net.target.key
             
             # Check if ports exist
             if base_source not in port_lookup:
@@ -1110,7 +2946,7 @@ class WrapperGenerator:
                                             config_line)
                 continue
             
-            if base_target not in port_lookup and target not in ['TIE0', 'TIE1', 'FLOAT']:
+            if base_target not in port_lookup and not net.target.is_special:
                 self.error_reporter.add_error("PORT_NOT_FOUND", 
                                             f"Target port '{base_target}' not found", 
                                             config_line)
@@ -1119,7 +2955,7 @@ class WrapperGenerator:
             source_port = port_lookup[base_source]
             
             # Check for invalid connections
-            if target not in ['TIE0', 'TIE1', 'FLOAT']:
+            if not net.target.is_special:
                 target_port = port_lookup[base_target]
                 
                 # Check direction compatibility
@@ -1142,34 +2978,6 @@ class WrapperGenerator:
                                                 f"Cannot tie {source_port.direction} port '{source}' to '{target}'", 
                                                 config_line)
     
-    def _extract_port_and_range(self, port_spec: str) -> Tuple[str, Optional[str]]:
-        """Extract port name and bit range from port specification"""
-        if '[' in port_spec and ']' in port_spec:
-            # Has bit range
-            port_name = port_spec.split('[')[0]
-            bit_range = '[' + port_spec.split('[')[1]
-            return port_name, bit_range
-        else:
-            return port_spec, None
-    
-    def _generate_wire_name(self, source_spec: str, target_spec: str) -> str:
-        """Generate concise wire name for connections"""
-        # Extract port names and ranges
-        source_port, source_range = self._extract_port_and_range(source_spec)
-        target_port, target_range = self._extract_port_and_range(target_spec)
-        
-        # Use source port as the base for wire name (more intuitive)
-        source_clean = source_port.replace('.', '_')
-        
-        # Add range information if present
-        range_suffix = ""
-        if source_range:
-            # Simplify range representation
-            source_bits = source_range.replace('[', '').replace(']', '').replace(':', '_')
-            range_suffix = f"_{source_bits}"
-        
-        return f"w_{source_clean}{range_suffix}"
-    
     def _get_port_width_value(self, width_str: str) -> str:
         """Extract the bit width value from port width string like '[7:0]' -> '8' """
         if not width_str:
@@ -1214,167 +3022,166 @@ class WrapperGenerator:
         # Normal connection
         return f"w_{connection_spec.replace('.', '_')}"
     
-    def _analyze_port_partial_connections(self, instance: Instance, port: Port, instance_to_top: Dict[str, str], instance_connections: List[Dict]) -> List[str]:
-        """Analyze partial connections for a port and return unconnected bit ranges"""
+    def _build_net_index(self, nets: List[Net]) -> Dict[str, Net]:
+        """Map 'instance.port' to the first instance connection that references it"""
+        net_index = {}
+        for net in nets:
+            for endpoint in (net.source, net.target):
+                if not endpoint.is_special:
+                    net_index.setdefault(endpoint.key, net)
+        return net_index
+    
+    def _build_export_index(self, exports: List[Net]) -> Dict[str, str]:
+        """Map exported 'instance.port' to its top port name, first export wins"""
+        export_index = {}
+        for export in exports:
+            export_index.setdefault(export.source.key, export.target.port)
+        return export_index
+    
+    def _build_top_index(self, top_nets: List[Net]) -> Dict[str, Net]:
+        """Map 'instance.port' to its first instance-to-top mapping"""
+        top_index = {}
+        for net in top_nets:
+            top_index.setdefault(net.source.key, net)
+        return top_index
+    
+    def _build_port_connection_index(self, design: Design) -> Dict[str, List[Optional[str]]]:
+        """Index every connection by 'instance.port', recording the slice used (None for the whole port)"""
+        index = {}
+        for net in design.top_nets:
+            index.setdefault(net.source.key, []).append(net.source.range)
+        
+        for net in design.nets:
+            for endpoint in (net.source, net.target):
+                if not endpoint.is_special:
+                    index.setdefault(endpoint.key, []).append(endpoint.range)
+        
+        # Exported ports are connected as a whole
+        for export in design.exports:
+            index.setdefault(export.source.key, []).append(None)
+        
+        return index
+    
+    def _evaluate_bit_range(self, range_str: str, param_values: Dict[str, str]) -> Optional[Tuple[int, int]]:
+        """Evaluate '[msb:lsb]' or '[bit]' to integers, or None if it is not constant or out of range"""
+        bounds = self._bit_range_bounds(range_str, param_values)
+        if bounds is None or self._bit_range_exceeds_limit(bounds):
+            return None  # validation reports out-of-range bounds as INVALID_BIT_RANGE
+        return bounds
+    
+    @staticmethod
+    def _bit_range_bounds(range_str: str, param_values: Dict[str, str]) -> Optional[Tuple[int, int]]:
+        """Evaluate '[msb:lsb]' or '[bit]' to integers without a range check, or None if it is not constant"""
+        parts = split_range(range_str.strip().strip('[]'))
+        try:
+            bounds = [ConstantExpression.compile(part).evaluate(param_values) for part in parts]
+        except ValueError:
+            return None
+        if not all(isinstance(bound, int) and bound >= 0 for bound in bounds):
+            return None
+        return bounds[0], bounds[-1]
+    
+    @staticmethod
+    def _bit_range_exceeds_limit(bounds: Optional[Tuple[int, int]]) -> bool:
+        return bounds is not None and max(bounds) >= ConstantExpression._MAX_BITS
+    
+    def _report_bit_range(self, description: str, range_str: str, config_line: str):
+        """Report a bit range with an index beyond ConstantExpression._MAX_BITS"""
+        self.error_reporter.add_error("INVALID_BIT_RANGE",
+                                      f"{description} range {range_str} exceeds the {ConstantExpression._MAX_BITS}-bit limit",
+                                      config_line)
+    
+    def _analyze_port_partial_connections(self, instance: Instance, port: Port, port_slices: List[Optional[str]]) -> List[str]:
+        """Analyze partial connections for a port and return unconnected bit ranges
+        
+        port_slices are the port's entries in the connection index.  Overlapping
+        slices on an input port mean several drivers and are reported as warnings.
+        """
         if not port.width:
             return []  # Not a multibit port
         
-        # Parse port width to get bit range
-        width_match = re.match(r'\[(\d+):(\d+)\]', port.width)
-        if not width_match:
-            return []  # Cannot parse width
-        
-        msb = int(width_match.group(1))
-        lsb = int(width_match.group(2))
-        
-        # Track which bits are connected
-        connected_bits = set()
-        
-        # Check instance-to-top connections
-        inst_port_name = f"{instance.instance_name}.{port.name}"
-        for mapped_port, top_port_name in instance_to_top.items():
-            if mapped_port.startswith(inst_port_name):
-                # Extract bit range from mapped port
-                if '[' in mapped_port and ']' in mapped_port:
-                    # Handle both [msb:lsb] and [bit] formats
-                    range_match = re.search(r'\[(\d+):(\d+)\]', mapped_port)
-                    single_bit_match = re.search(r'\[(\d+)\]', mapped_port)
-                    
-                    if range_match:
-                        range_msb = int(range_match.group(1))
-                        range_lsb = int(range_match.group(2))
-                        for bit in range(range_lsb, range_msb + 1):
-                            connected_bits.add(bit)
-                    elif single_bit_match:
-                        bit = int(single_bit_match.group(1))
-                        connected_bits.add(bit)
-                elif mapped_port == inst_port_name:
-                    # Full port connection
-                    for bit in range(lsb, msb + 1):
-                        connected_bits.add(bit)
-        
-        # Check instance-to-instance connections
-        for connection in instance_connections:
-            source_port, source_range = self._extract_port_and_range(connection['source'])
-            target_port, target_range = self._extract_port_and_range(connection['target'])
-            
-            if source_port == inst_port_name:
-                if source_range:
-                    # Handle both [msb:lsb] and [bit] formats
-                    range_match = re.search(r'\[(\d+):(\d+)\]', source_range)
-                    single_bit_match = re.search(r'\[(\d+)\]', source_range)
-                    
-                    if range_match:
-                        range_msb = int(range_match.group(1))
-                        range_lsb = int(range_match.group(2))
-                        for bit in range(range_lsb, range_msb + 1):
-                            connected_bits.add(bit)
-                    elif single_bit_match:
-                        bit = int(single_bit_match.group(1))
-                        connected_bits.add(bit)
-                else:
-                    # Full port connection
-                    for bit in range(lsb, msb + 1):
-                        connected_bits.add(bit)
-            elif target_port == inst_port_name:
-                if target_range:
-                    # Handle both [msb:lsb] and [bit] formats
-                    range_match = re.search(r'\[(\d+):(\d+)\]', target_range)
-                    single_bit_match = re.search(r'\[(\d+)\]', target_range)
-                    
-                    if range_match:
-                        range_msb = int(range_match.group(1))
-                        range_lsb = int(range_match.group(2))
-                        for bit in range(range_lsb, range_msb + 1):
-                            connected_bits.add(bit)
-                    elif single_bit_match:
-                        bit = int(single_bit_match.group(1))
-                        connected_bits.add(bit)
-                else:
-                    # Full port connection
-                    for bit in range(lsb, msb + 1):
-                        connected_bits.add(bit)
-        
-        # Find unconnected bit ranges
-        unconnected_ranges = []
-        all_bits = set(range(lsb, msb + 1))
-        unconnected_bits = sorted(all_bits - connected_bits)
-        
-        # Group consecutive unconnected bits into ranges
-        if unconnected_bits:
-            range_start = unconnected_bits[0]
-            range_end = unconnected_bits[0]
-            
-            for bit in unconnected_bits[1:]:
-                if bit == range_end + 1:
-                    range_end = bit
-                else:
-                    # End of current range, add it
-                    if range_start == range_end:
-                        unconnected_ranges.append(f"[{range_start}]")
-                    else:
-                        unconnected_ranges.append(f"[{range_end}:{range_start}]")
-                    range_start = bit
-                    range_end = bit
-            
-            # Add final range
-            if range_start == range_end:
-                unconnected_ranges.append(f"[{range_start}]")
+        # Port bounds with this instance's parameter values
+        instance_params = self._get_instance_parameters(instance)
+        bounds = self._evaluate_bit_range(port.width, instance_params)
+        if bounds is None:
+            return []  # Cannot evaluate width
+        msb, lsb = bounds
+        
+        connected = BitRangeSet()
+        for bit_range in port_slices:
+            if bit_range is None:
+                slice_bounds = bounds  # Full port connection
             else:
-                unconnected_ranges.append(f"[{range_end}:{range_start}]")
+                slice_bounds = self._evaluate_bit_range(bit_range, instance_params)
+                if slice_bounds is None:
+                    continue
+            overlap = connected.add(*slice_bounds)
+            if overlap and port.direction == 'input':
+                overlapping = ", ".join(BitRangeSet.format_range(high, low) for high, low in reversed(BitRangeSet.ranges(overlap)))
+                self.error_reporter.add_warning("OVERLAPPING_DRIVERS",
+                                                f"Bits {overlapping} of input '{instance.instance_name}.{port.name}' have more than one driver",
+                                                "")
+        
+        # Group unconnected bits into ranges, lowest first
+        return [BitRangeSet.format_range(high, low) for high, low in connected.missing(msb, lsb)]
+    
+    def _get_module_parameters(self, file_path: str, module_name: str = None) -> Dict[str, str]:
+        """Return the module's resolved default parameters, memoized for the current run"""
+        return self._resolve_module_parameters(file_path, module_name, {})
+    
+    def _get_instance_parameters(self, instance: Instance) -> Dict[str, str]:
+        """Return the instance's fully resolved parameters, computed once and stored on the instance"""
+        if instance.resolved_parameters is None:
+            instance.resolved_parameters = self._resolve_module_parameters(
+                instance.module.file_path, instance.module.name, instance.parameters or {})
+        return instance.resolved_parameters
+    
+    def _resolve_module_parameters(self, file_path: str, module_name: str, overrides: Dict[str, str]) -> Dict[str, str]:
+        """Resolve module parameters with instance overrides applied to the original expressions.
+        
+        Results are shared by every instance of the same module with the same overrides,
+        so callers must treat the returned dict as read-only.  Entries are kept across
+        runs and reused for as long as the module library serves the same header; an
+        entry for a changed header is replaced, and beyond PARAMETER_MEMO_LIMIT entries
+        the least recently used ones are dropped, so long-lived generators stay bounded.
+        """
+        try:
+            module_header = self.parser.library.get_module(file_path, module_name)
+        except FileNotFoundError:
+            module_header = None
         
-        return unconnected_ranges
+        key = (os.path.abspath(file_path), module_name, tuple(sorted(overrides.items())))
+        entry = self._parameter_memo.get(key)
+        if entry is not None and entry[0] is module_header:
+            self._parameter_memo.move_to_end(key)
+            return entry[1]
+        
+        if not overrides:
+            resolved_params = self._extract_parameters_from_module(file_path, module_name)
+        else:
+            # Overrides replace the declared expressions so dependent localparams are re-evaluated
+            param_dict = dict(module_header.parameters) if module_header else {}
+            param_dict.update(overrides)
+            resolved_params = self._resolve_parameter_dependencies_improved(param_dict)
+        
+        self._parameter_memo[key] = (module_header, resolved_params)
+        self._parameter_memo.move_to_end(key)
+        while len(self._parameter_memo) > self.PARAMETER_MEMO_LIMIT:
+            self._parameter_memo.popitem(last=False)
+        return resolved_params
     
-    def _extract_parameters_from_module(self, file_path: str) -> Dict[str, str]:
+    def _extract_parameters_from_module(self, file_path: str, module_name: str = None) -> Dict[str, str]:
         """Extract all parameter and localparam values from module, handling dependencies"""
         try:
-            with open(file_path, 'r') as f:
-                content = f.read()
+            module_header = self.parser.library.get_module(file_path, module_name)
         except FileNotFoundError:
             return {}
         
-        # Remove comments
-        content = re.sub(r'//.*', '', content)
-        content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
-        
-        # Find module declaration with parameters
-        module_match = self.parser._find_module_declaration(content)
-        if not module_match:
-            # Try to find module declaration manually as fallback
-            module_fallback_match = re.search(r'module\s+\w+', content)
-            if not module_fallback_match:
-                return {}
-        
-        # Extract parameter declarations from module header and body
-        param_dict = {}
-        clean_content = re.sub(r'\s+', ' ', content)
-        
-        # Find parameters in module declaration header
-        param_section_match = re.search(r'module\s+\w+\s*#\s*\((.*?)\)\s*\(', clean_content, re.DOTALL)
-        if param_section_match:
-            param_section = param_section_match.group(1)
-            
-            # Enhanced parameter parsing using manual parsing to handle complex expressions
-            # Split by commas first, then parse each declaration
-            param_dict.update(self._parse_parameter_declarations(param_section))
-        
-        # Also find parameters in module body (for cases where they are declared separately)
-        module_body_match = re.search(r'module\s+\w+[^;]*;\s*(.*?)\s*endmodule', clean_content, re.DOTALL)
-        if module_body_match:
-            module_body = module_body_match.group(1)
-            
-            # Find parameter declarations in module body - improved to handle complex expressions
-            body_param_pattern = r'(parameter|localparam)\s+(\w+)\s*=\s*([^;]+);'
-            body_matches = re.findall(body_param_pattern, module_body, re.DOTALL)
-            
-            for param_type, param_name, param_value in body_matches:
-                param_value = param_value.strip()
-                param_dict[param_name.strip()] = param_value
+        if not module_header:
+            return {}
         
-        # Store original expressions for later dependency resolution
-        self._original_expressions = {}
-        for param_name, param_value in param_dict.items():
-            self._original_expressions[param_name] = param_value
+        # Parameter declarations from module header and body, in declaration order
+        param_dict = dict(module_header.parameters)
         
         # Generate immediate parsing report
         self._generate_immediate_parsing_report(file_path, param_dict)
@@ -1385,22 +3192,24 @@ class WrapperGenerator:
         return resolved_params
     
     def _generate_immediate_parsing_report(self, file_path: str, param_dict: Dict[str, str]):
-        """Generate immediate parsing report for a single module"""
-        import os
-        
-        # Ensure rpt directory exists
-        rpt_dir = "./rpt"
-        if not os.path.exists(rpt_dir):
-            os.makedirs(rpt_dir)
-        
-        # Get module name from file path
-        module_name = os.path.splitext(os.path.basename(file_path))[0]
+        """Record a parsing report entry for a single module"""
+        if not self.context.wants_report('debug'):
+            return
         
-        # Write immediate parsing report
-        with open(f"{rpt_dir}/01_parsing_report.txt", 'a') as f:
+        # Entries accumulate for the run; the file is written once, unless the final report replaces it
+        records = self.debug_info.setdefault('parsing_records', [])
+        records.append((file_path, param_dict, self._get_timestamp()))
+        self._add_report("01_parsing_report.txt", 'debug', lambda f: self._write_parsing_records(f, records))
+    
+    def _write_parsing_records(self, f, records: List[Tuple[str, Dict[str, str], str]]):
+        """Write the per-module parsing entries recorded during the run"""
+        for file_path, param_dict, timestamp in records:
+            # Get module name from file path
+            module_name = os.path.splitext(os.path.basename(file_path))[0]
+            
             f.write(f"# Parsing Report for {module_name}\n")
             f.write(f"# File: {file_path}\n")
-            f.write(f"# Generated: {self._get_timestamp()}\n\n")
+            f.write(f"# Generated: {timestamp}\n\n")
             f.write("=" * 60 + "\n")
             f.write(f"MODULE: {module_name}\n")
             f.write("=" * 60 + "\n\n")
@@ -1425,9 +3234,7 @@ class WrapperGenerator:
         import os
         
         # Ensure rpt directory exists
-        rpt_dir = "./rpt"
-        if not os.path.exists(rpt_dir):
-            os.makedirs(rpt_dir)
+        rpt_dir = self.context.ensure_rpt_dir()
         
         # Get config file name
         config_file_name = os.path.basename(file_path)
@@ -1455,509 +3262,217 @@ class WrapperGenerator:
             
             f.write("\n" + "-" * 60 + "\n\n")
     
-    def _generate_immediate_parameter_report(self, parameter_debug_info: Dict):
-        """Generate immediate parameter report"""
-        import os
-        
-        # Ensure rpt directory exists
-        rpt_dir = "./rpt"
-        if not os.path.exists(rpt_dir):
-            os.makedirs(rpt_dir)
-        
-        # Write immediate parameter report
-        with open(f"{rpt_dir}/04_parameter_report.txt", 'a') as f:
-            f.write(f"# Parameter Resolution Report\n")
-            f.write(f"# Generated: {self._get_timestamp()}\n\n")
-            f.write("=" * 60 + "\n")
-            f.write("PARAMETER RESOLUTION ANALYSIS\n")
-            f.write("=" * 60 + "\n\n")
-            
-            for instance_name, param_info in parameter_debug_info.items():
-                f.write(f"Instance: {instance_name}\n")
-                f.write(f"Original parameters: {len(param_info['original'])}\n")
-                f.write(f"Override parameters: {len(param_info['overrides'])}\n")
-                f.write(f"Resolved parameters: {len(param_info['resolved'])}\n\n")
-                
-                if param_info['original']:
-                    f.write("Original parameters:\n")
-                    for param_name, param_value in param_info['original'].items():
-                        f.write(f"  {param_name:20} = {param_value}\n")
-                    f.write("\n")
-                
-                if param_info['overrides']:
-                    f.write("Override parameters:\n")
-                    for param_name, param_value in param_info['overrides'].items():
-                        f.write(f"  {param_name:20} = {param_value}\n")
-                    f.write("\n")
-                
-                if param_info['resolved']:
-                    f.write("Resolved parameters:\n")
-                    for param_name, param_value in param_info['resolved'].items():
-                        f.write(f"  {param_name:20} = {param_value}\n")
-                    f.write("\n")
-                
-                f.write("-" * 40 + "\n\n")
-    
-    def _generate_immediate_wire_report(self, wire_generation_info: Dict):
-        """Generate immediate wire generation report"""
-        import os
-        
-        # Ensure rpt directory exists
-        rpt_dir = "./rpt"
-        if not os.path.exists(rpt_dir):
-            os.makedirs(rpt_dir)
-        
-        # Write immediate wire report
-        with open(f"{rpt_dir}/05_wire_report.txt", 'a') as f:
-            f.write(f"# Wire Generation Report\n")
-            f.write(f"# Generated: {self._get_timestamp()}\n\n")
-            f.write("=" * 60 + "\n")
-            f.write("WIRE GENERATION ANALYSIS\n")
-            f.write("=" * 60 + "\n\n")
-            
-            f.write(f"Total internal wires: {len(wire_generation_info['internal_wires'])}\n")
-            f.write(f"Total connections: {len(wire_generation_info['connections'])}\n\n")
-            
-            if wire_generation_info['internal_wires']:
-                f.write("Internal wires:\n")
-                for wire_name, wire_width in wire_generation_info['internal_wires'].items():
-                    width_str = f"[{wire_width}]" if wire_width else ""
-                    f.write(f"  {wire_name:30} {width_str}\n")
-                f.write("\n")
-            
-            if wire_generation_info['connections']:
-                f.write("Connections:\n")
-                for i, connection in enumerate(wire_generation_info['connections']):
-                    f.write(f"  {i+1:2}: {connection['source']} -> {connection['target']}\n")
-                f.write("\n")
-            
-            f.write("-" * 60 + "\n\n")
-    
     def _generate_debug_reports(self, config_dir: str = "./config"):
         """Generate comprehensive debug reports for each step"""
-        import os
-        
-        # Ensure rpt directory exists
-        rpt_dir = "./rpt"
-        if not os.path.exists(rpt_dir):
-            os.makedirs(rpt_dir)
+        if not self.context.wants_report('debug'):
+            return
         
         # 1. Generate parsing report
-        self._generate_parsing_report(rpt_dir)
+        if 'parsed_modules' in self.debug_info:
+            self._add_report("01_parsing_report.txt", 'debug', self._generate_parsing_report)
         
         # 2. Generate configuration report
-        self._generate_config_report(config_dir, rpt_dir)
+        self._add_report("02_config_report.txt", 'debug', lambda f: self._generate_config_report(config_dir, f))
         
         # 3. Generate connection analysis report
-        self._generate_connection_report(rpt_dir)
+        if 'design' in self.debug_info:
+            self._add_report("03_connection_report.txt", 'debug', self._generate_connection_report)
         
         # 4. Generate parameter resolution report
-        self._generate_parameter_report(rpt_dir)
+        if 'parameters' in self.debug_info:
+            self._add_report("04_parameter_report.txt", 'debug', self._generate_parameter_report)
         
         # 5. Generate wire generation report
-        self._generate_wire_report(rpt_dir)
+        if 'wires' in self.debug_info:
+            self._add_report("05_wire_report.txt", 'debug', self._generate_wire_report)
         
-        print(f"Debug reports generated in {rpt_dir}/ directory")
+        if not self.context.quiet:
+            print(f"Debug reports generated in {self.context.rpt_dir}/ directory")
     
-    def _generate_parsing_report(self, rpt_dir: str):
+    def _generate_parsing_report(self, f):
         """Generate detailed parsing report for each module"""
-        if 'parsed_modules' not in self.debug_info:
-            return
-        
-        with open(f"{rpt_dir}/01_parsing_report.txt", 'w') as f:
-            f.write("# Verilog Module Parsing Report\n")
-            f.write("# Generated by Verilog Wrapper Generator\n\n")
-            f.write("=" * 60 + "\n")
-            f.write("MODULE PARSING ANALYSIS\n")
-            f.write("=" * 60 + "\n\n")
-            
-            for module_info in self.debug_info['parsed_modules']:
-                f.write(f"Module: {module_info['name']}\n")
-                f.write(f"File: {module_info['file']}\n")
-                f.write(f"Parameters: {len(module_info.get('parameters', {}))}\n")
-                f.write(f"Ports: {len(module_info.get('ports', []))}\n\n")
-                
-                # Parameter details
-                if module_info.get('parameters'):
-                    f.write("Parameters:\n")
-                    for param_name, param_value in module_info['parameters'].items():
-                        f.write(f"  {param_name} = {param_value}\n")
-                    f.write("\n")
-                
-                # Port details
-                if module_info.get('ports'):
-                    f.write("Ports:\n")
-                    for port in module_info['ports']:
-                        width_str = f"[{port.width}]" if port.width else ""
-                        f.write(f"  {port.direction:6} {width_str:15} {port.name}\n")
-                    f.write("\n")
-                
-                f.write("-" * 40 + "\n\n")
-    
-    def _generate_config_report(self, config_dir: str, rpt_dir: str):
-        """Generate configuration parsing report"""
-        with open(f"{rpt_dir}/02_config_report.txt", 'w') as f:
-            f.write("# Configuration Parsing Report\n")
-            f.write("# Generated by Verilog Wrapper Generator\n\n")
-            f.write("=" * 60 + "\n")
-            f.write("CONFIGURATION ANALYSIS\n")
-            f.write("=" * 60 + "\n\n")
-            
-            # Parse and report each config file
-            config_files = [
-                ('01_top_module.cmd', 'Top Module Configuration'),
-                ('02_instances.cmd', 'Instance Configuration'),
-                ('03_top_ports.cmd', 'Top Port Configuration'),
-                ('04_instance_to_top.cmd', 'Instance to Top Mapping'),
-                ('05_instance_connections.cmd', 'Instance Connections'),
-                ('06_instance_export_port.cmd', 'Instance Export Ports')
-            ]
-            
-            for config_file, description in config_files:
-                f.write(f"{description}:\n")
-                f.write(f"File: {config_file}\n")
-                
-                try:
-                    with open(f"{config_dir}/{config_file}", 'r') as cf:
-                        content = cf.read()
-                        f.write(f"Content:\n{content}\n")
-                except FileNotFoundError:
-                    f.write("File not found\n")
-                
-                f.write("-" * 40 + "\n\n")
-    
-    def _generate_connection_report(self, rpt_dir: str):
-        """Generate connection analysis report"""
-        if 'connections' not in self.debug_info:
-            return
-        
-        with open(f"{rpt_dir}/03_connection_report.txt", 'w') as f:
-            f.write("# Connection Analysis Report\n")
-            f.write("# Generated by Verilog Wrapper Generator\n\n")
-            f.write("=" * 60 + "\n")
-            f.write("CONNECTION ANALYSIS\n")
-            f.write("=" * 60 + "\n\n")
-            
-            connections = self.debug_info['connections']
+        f.write("# Verilog Module Parsing Report\n")
+        f.write("# Generated by Verilog Wrapper Generator\n\n")
+        f.write("=" * 60 + "\n")
+        f.write("MODULE PARSING ANALYSIS\n")
+        f.write("=" * 60 + "\n\n")
+        
+        for module_info in self.debug_info['parsed_modules']:
+            f.write(f"Module: {module_info['name']}\n")
+            f.write(f"File: {module_info['file']}\n")
+            f.write(f"Parameters: {len(module_info.get('parameters', {}))}\n")
+            f.write(f"Ports: {len(module_info.get('ports', []))}\n\n")
             
-            f.write("Instance-to-Top Connections:\n")
-            for source, target in connections.get('instance_to_top', {}).items():
-                f.write(f"  {source} -> {target}\n")
-            f.write("\n")
-            
-            f.write("Instance-to-Instance Connections:\n")
-            for conn in connections.get('instance_connections', []):
-                f.write(f"  {conn['source']} -> {conn['target']}\n")
-            f.write("\n")
-            
-            if connections.get('export_ports'):
-                f.write("Export Ports:\n")
-                for export in connections['export_ports']:
-                    f.write(f"  {export}\n")
-                f.write("\n")
-    
-    def _generate_parameter_report(self, rpt_dir: str):
-        """Generate parameter resolution report"""
-        if 'parameters' not in self.debug_info:
-            return
-        
-        with open(f"{rpt_dir}/04_parameter_report.txt", 'w') as f:
-            f.write("# Parameter Resolution Report\n")
-            f.write("# Generated by Verilog Wrapper Generator\n\n")
-            f.write("=" * 60 + "\n")
-            f.write("PARAMETER RESOLUTION ANALYSIS\n")
-            f.write("=" * 60 + "\n\n")
-            
-            params = self.debug_info['parameters']
-            
-            for instance_name, instance_params in params.items():
-                f.write(f"Instance: {instance_name}\n")
-                f.write("Original Parameters:\n")
-                for param_name, param_value in instance_params.get('original', {}).items():
-                    f.write(f"  {param_name} = {param_value}\n")
-                f.write("\n")
-                
-                f.write("Resolved Parameters:\n")
-                for param_name, param_value in instance_params.get('resolved', {}).items():
+            # Parameter details
+            if module_info.get('parameters'):
+                f.write("Parameters:\n")
+                for param_name, param_value in module_info['parameters'].items():
                     f.write(f"  {param_name} = {param_value}\n")
                 f.write("\n")
-                
-                f.write("-" * 40 + "\n\n")
+            
+            # Port details
+            if module_info.get('ports'):
+                f.write("Ports:\n")
+                for port in module_info['ports']:
+                    width_str = f"[{port.width}]" if port.width else ""
+                    f.write(f"  {port.direction:6} {width_str:15} {port.name}\n")
+                f.write("\n")
+            
+            f.write("-" * 40 + "\n\n")
     
-    def _generate_wire_report(self, rpt_dir: str):
-        """Generate wire generation report"""
-        if 'wires' not in self.debug_info:
-            return
-        
-        with open(f"{rpt_dir}/05_wire_report.txt", 'w') as f:
-            f.write("# Wire Generation Report\n")
-            f.write("# Generated by Verilog Wrapper Generator\n\n")
-            f.write("=" * 60 + "\n")
-            f.write("WIRE GENERATION ANALYSIS\n")
-            f.write("=" * 60 + "\n\n")
+    def _generate_config_report(self, config_dir: str, f):
+        """Generate configuration parsing report"""
+        f.write("# Configuration Parsing Report\n")
+        f.write("# Generated by Verilog Wrapper Generator\n\n")
+        f.write("=" * 60 + "\n")
+        f.write("CONFIGURATION ANALYSIS\n")
+        f.write("=" * 60 + "\n\n")
+        
+        # Parse and report each config file
+        config_files = [
+            ('01_top_module.cmd', 'Top Module Configuration'),
+            ('02_instances.cmd', 'Instance Configuration'),
+            ('03_top_ports.cmd', 'Top Port Configuration'),
+            ('04_instance_to_top.cmd', 'Instance to Top Mapping'),
+            ('05_instance_connections.cmd', 'Instance Connections'),
+            ('06_instance_export_port.cmd', 'Instance Export Ports')
+        ]
+        
+        for config_file, description in config_files:
+            f.write(f"{description}:\n")
+            f.write(f"File: {config_file}\n")
+            
+            try:
+                with open(f"{config_dir}/{config_file}", 'r') as cf:
+                    content = cf.read()
+                    f.write(f"Content:\n{content}\n")
+            except FileNotFoundError:
+                f.write("File not found\n")
             
-            wires = self.debug_info['wires']
+            f.write("-" * 40 + "\n\n")
+    
+    def _generate_connection_report(self, f):
+        """Generate connection analysis report"""
+        f.write("# Connection Analysis Report\n")
+        f.write("# Generated by Verilog Wrapper Generator\n\n")
+        f.write("=" * 60 + "\n")
+        f.write("CONNECTION ANALYSIS\n")
+        f.write("=" * 60 + "\n\n")
+        
+        design = self.debug_info['design']
+        
+        f.write("Instance-to-Top Connections:\n")
+        for net in design.top_nets:
+            f.write(f"  {net.config_line}\n")
+        f.write("\n")
+        
+        f.write("Instance-to-Instance Connections:\n")
+        for net in design.nets:
+            f.write(f"  {net.config_line}\n")
+        f.write("\n")
+        
+        if design.exports:
+            f.write("Export Ports:\n")
+            for export in design.exports:
+                f.write(f"  {export.config_line}\n")
+            f.write("\n")
+    
+    def _generate_parameter_report(self, f):
+        """Generate parameter resolution report"""
+        f.write("# Parameter Resolution Report\n")
+        f.write("# Generated by Verilog Wrapper Generator\n\n")
+        f.write("=" * 60 + "\n")
+        f.write("PARAMETER RESOLUTION ANALYSIS\n")
+        f.write("=" * 60 + "\n\n")
+        
+        params = self.debug_info['parameters']
+        
+        for instance_name, instance_params in params.items():
+            f.write(f"Instance: {instance_name}\n")
+            f.write("Original Parameters:\n")
+            for param_name, param_value in instance_params.get('original', {}).items():
+                f.write(f"  {param_name} = {param_value}\n")
+            f.write("\n")
             
-            f.write("Generated Internal Wires:\n")
-            for wire_name, wire_width in wires.items():
-                width_str = f"[{wire_width}]" if wire_width else ""
-                f.write(f"  wire {width_str:15} {wire_name};\n")
+            f.write("Resolved Parameters:\n")
+            for param_name, param_value in instance_params.get('resolved', {}).items():
+                f.write(f"  {param_name} = {param_value}\n")
             f.write("\n")
             
-            f.write(f"Total wires generated: {len(wires)}\n")
+            f.write("-" * 40 + "\n\n")
     
-    def _parse_parameter_declarations(self, param_section: str) -> Dict[str, str]:
-        """Parse parameter declarations from a section, handling complex expressions properly"""
-        param_dict = {}
+    def _generate_wire_report(self, f):
+        """Generate wire generation report"""
+        f.write("# Wire Generation Report\n")
+        f.write("# Generated by Verilog Wrapper Generator\n\n")
+        f.write("=" * 60 + "\n")
+        f.write("WIRE GENERATION ANALYSIS\n")
+        f.write("=" * 60 + "\n\n")
         
-        # Remove extra spaces
-        param_section = param_section.strip()
+        wires = self.debug_info['wires']
         
-        # Manual parsing to handle complex expressions with nested parentheses
-        i = 0
-        while i < len(param_section):
-            # Skip whitespace
-            while i < len(param_section) and param_section[i].isspace():
-                i += 1
-            
-            if i >= len(param_section):
-                break
-                
-            # Look for parameter or localparam keyword
-            if param_section[i:].startswith('parameter'):
-                param_type = 'parameter'
-                i += 9  # len('parameter')
-            elif param_section[i:].startswith('localparam'):
-                param_type = 'localparam'
-                i += 10  # len('localparam')
-            else:
-                # Skip unexpected characters
-                i += 1
-                continue
-            
-            # Skip whitespace
-            while i < len(param_section) and param_section[i].isspace():
-                i += 1
-            
-            # Extract parameter name
-            param_name_start = i
-            while i < len(param_section) and (param_section[i].isalnum() or param_section[i] == '_'):
-                i += 1
-            
-            if param_name_start == i:
-                continue  # No valid parameter name found
-                
-            param_name = param_section[param_name_start:i]
-            
-            # Skip whitespace and '='
-            while i < len(param_section) and param_section[i].isspace():
-                i += 1
-            
-            if i >= len(param_section) or param_section[i] != '=':
-                continue  # No '=' found
-                
-            i += 1  # Skip '='
-            
-            # Skip whitespace
-            while i < len(param_section) and param_section[i].isspace():
-                i += 1
-            
-            # Extract parameter value until next parameter declaration or end
-            param_value_start = i
-            paren_depth = 0
-            
-            while i < len(param_section):
-                char = param_section[i]
-                
-                if char == '(':
-                    paren_depth += 1
-                elif char == ')':
-                    paren_depth -= 1
-                elif char == ',' and paren_depth == 0:
-                    # Found comma at top level, this ends the parameter value
-                    break
-                    
-                i += 1
-            
-            param_value = param_section[param_value_start:i].strip()
-            
-            # Remove trailing comma if present
-            param_value = re.sub(r',$', '', param_value)
-            
-            param_dict[param_name] = param_value
-            
-            # Skip the comma if present
-            if i < len(param_section) and param_section[i] == ',':
-                i += 1
+        f.write("Generated Internal Wires:\n")
+        for wire_name, wire_width in wires.items():
+            width_str = f"[{wire_width}]" if wire_width else ""
+            f.write(f"  wire {width_str:15} {wire_name};\n")
+        f.write("\n")
         
-        return param_dict
+        f.write(f"Total wires generated: {len(wires)}\n")
     
     def _resolve_parameter_dependencies_improved(self, param_dict: Dict[str, str]) -> Dict[str, str]:
-        """Improved parameter dependency resolution with topological sorting"""
-        # Create dependency graph
+        """Improved parameter dependency resolution with topological sorting
+        
+        Dependencies come from the identifiers of each compiled expression, and
+        every parameter is evaluated (or substituted) exactly once after its
+        dependencies, so the cost is linear in parameters plus references.
+        """
+        # Create dependency graph, in order of first reference
         dependencies = {}
         for param_name, param_value in param_dict.items():
-            deps = set()
-            for other_param in param_dict.keys():
-                if other_param != param_name and re.search(r'\b' + other_param + r'\b', param_value):
-                    deps.add(other_param)
-            dependencies[param_name] = deps
+            names = ConstantExpression.compile(param_value).names
+            dependencies[param_name] = [name for name in names if name != param_name and name in param_dict]
         
-        # Topological sort to resolve dependencies in correct order
+        # Depth-first topological walk to resolve dependencies in correct order
         resolved_params = {}
-        visited = set()
-        temp_visited = set()
+        values = {}  # parameter name -> evaluated number
+        in_progress = set()
+        done = set()
         
-        def resolve_param(param_name):
-            if param_name in temp_visited:
-                # Circular dependency - keep original expression
-                resolved_params[param_name] = param_dict[param_name]
-                return
-            if param_name in visited:
-                return
-            
-            temp_visited.add(param_name)
-            
-            # First resolve all dependencies
-            for dep in dependencies.get(param_name, set()):
-                if dep not in visited:
-                    resolve_param(dep)
-            
-            # Now resolve this parameter
-            param_value = param_dict[param_name]
-            
-            # Substitute resolved parameters
-            for dep in dependencies.get(param_name, set()):
-                if dep in resolved_params:
-                    param_value = re.sub(r'\b' + dep + r'\b', resolved_params[dep], param_value)
-            
-            # Try to evaluate the expression
-            try:
-                # Handle conditional expressions (ternary operator)
-                if '?' in param_value and ':' in param_value:
-                    # For simple conditional expressions, try to evaluate
-                    # Handle both (condition) ? true : false and condition ? true : false
-                    ternary_match = re.match(r'^\s*\(?([^)]+)\)?\s*\?\s*([^:]+)\s*:\s*(.+)$', param_value)
-                    if ternary_match:
-                        condition, true_val, false_val = ternary_match.groups()
-                        # Try to evaluate condition
-                        try:
-                            # Replace system functions with placeholders for evaluation
-                            eval_condition = condition.strip()
-                            # Handle $clog2 function properly
-                            def replace_clog2(match):
-                                arg = match.group(1).strip()
-                                try:
-                                    # Try to evaluate the argument
-                                    arg_val = eval(arg)
-                                    import math
-                                    return str(int(math.ceil(math.log2(arg_val))) if arg_val > 0 else 1)
-                                except:
-                                    return '6'  # Default placeholder
-                            eval_condition = re.sub(r'\$clog2\(([^)]+)\)', replace_clog2, eval_condition)
-                            eval_condition = re.sub(r'<<', '**', eval_condition)  # Bit shift to power
-                            
-                            if eval(eval_condition):
-                                param_value = true_val.strip()
-                            else:
-                                param_value = false_val.strip()
-                            
-                            # If the result still contains expressions, try to evaluate them
-                            if '$clog2' in param_value:
-                                param_value = re.sub(r'\$clog2\(([^)]+)\)', replace_clog2, param_value)
-                            if re.match(r'^[\d\+\-\*\/\(\)\s]+$', param_value):
-                                param_value = str(eval(param_value))
-                                
-                        except:
-                            # Keep original expression if evaluation fails
-                            pass
+        for root in param_dict:
+            if root in done:
+                continue
+            in_progress.add(root)
+            stack = [(root, iter(dependencies[root]))]
+            while stack:
+                param_name, pending = stack[-1]
+                for dep in pending:
+                    if dep in in_progress:
+                        # Circular dependency - keep original expression
+                        resolved_params[dep] = param_dict[dep]
+                    elif dep not in done:
+                        in_progress.add(dep)
+                        stack.append((dep, iter(dependencies[dep])))
+                        break
+                else:
+                    stack.pop()
+                    in_progress.discard(param_name)
+                    done.add(param_name)
                     
-                    # Update resolved_params with the final value
-                    resolved_params[param_name] = param_value
-                
-                # Handle arithmetic expressions with basic operators
-                elif re.match(r'^[\d\+\-\*\/\(\)\s<<>>]+$', param_value):
-                    # Replace bit shift with power for evaluation
-                    eval_expr = param_value.replace('<<', '**')
-                    eval_expr = re.sub(r'(\d+)\s*\*\*\s*(\d+)', lambda m: str(1 << int(m.group(2))), eval_expr)
-                    resolved_params[param_name] = str(eval(eval_expr))
-                # Handle system functions
-                elif '$clog2' in param_value:
-                    # Handle $clog2 function
-                    def replace_clog2(match):
-                        arg = match.group(1).strip()
-                        try:
-                            # Try to evaluate the argument
-                            arg_val = eval(arg)
-                            import math
-                            return str(int(math.ceil(math.log2(arg_val))) if arg_val > 0 else 1)
-                        except:
-                            return '6'  # Default placeholder
-                    eval_expr = re.sub(r'\$clog2\(([^)]+)\)', replace_clog2, param_value)
-                    # Try to evaluate the result
+                    # All dependencies resolved: evaluate against their numeric
+                    # values, otherwise substitute their resolved text
+                    expression = ConstantExpression.compile(param_dict[param_name])
                     try:
-                        resolved_params[param_name] = str(eval(eval_expr))
-                    except:
-                        resolved_params[param_name] = param_value
-                else:
-                    # Keep as-is for complex expressions
-                    resolved_params[param_name] = param_value
-            except:
-                # If evaluation fails, keep the original expression
-                resolved_params[param_name] = param_value
-            
-            temp_visited.remove(param_name)
-            visited.add(param_name)
-        
-        # Resolve all parameters
-        for param_name in param_dict.keys():
-            if param_name not in visited:
-                resolve_param(param_name)
-        
-        return resolved_params
-    
-    def _resolve_parameter_dependencies(self, param_dict: Dict[str, str]) -> Dict[str, str]:
-        """Resolve parameter dependencies in parameter dictionary using original expressions"""
-        # Make a copy to avoid modifying original
-        resolved_params = param_dict.copy()
-        
-        # Use original expressions if available for local parameters that need re-evaluation
-        if hasattr(self, '_original_expressions'):
-            for param_name, original_expr in self._original_expressions.items():
-                # Check if this is a local parameter expression that references other parameters
-                if any(other_param in original_expr for other_param in resolved_params.keys() if other_param != param_name):
-                    # This expression references other parameters, use the original
-                    resolved_params[param_name] = original_expr
-        
-        # Resolve parameter dependencies (local parameters that reference other parameters)
-        max_iterations = 10  # Prevent infinite loops
-        for _ in range(max_iterations):
-            changes_made = False
-            for param_name, param_value in resolved_params.items():
-                # Check if this parameter value references other parameters
-                for other_param, other_value in resolved_params.items():
-                    if other_param != param_name and re.search(r'\b' + other_param + r'\b', param_value):
-                        # Replace parameter reference with its value
-                        new_value = re.sub(r'\b' + other_param + r'\b', other_value, param_value)
-                        if new_value != param_value:
-                            resolved_params[param_name] = new_value
-                            changes_made = True
-            
-            if not changes_made:
-                break
-        
-        # Evaluate arithmetic expressions
-        for param_name, param_value in resolved_params.items():
-            try:
-                if re.match(r'^[\d\+\-\*\/\(\)\s]+$', param_value):
-                    resolved_params[param_name] = str(eval(param_value))
-            except:
-                pass
+                        value = expression.evaluate(values)
+                        values[param_name] = value
+                        resolved_params[param_name] = str(value)
+                    except ValueError:
+                        resolved_params[param_name] = expression.substitute(
+                            {dep: resolved_params[dep] for dep in dependencies[param_name] if dep in resolved_params})
         
         return resolved_params
     
     def _substitute_parameters(self, width_str: str, param_values: Dict[str, str]) -> str:
-        """Substitute parameter values in width string"""
+        """Substitute parameter values in width string and evaluate constant expressions"""
         if not width_str:
             return width_str
         
@@ -1966,40 +3481,16 @@ class WrapperGenerator:
         if original_has_brackets:
             width_str = width_str[1:-1]  # Remove [ and ]
         
-        # Replace parameter names with actual values
-        for param_name, param_value in param_values.items():
-            # Replace parameter name with value
-            width_str = re.sub(r'\b' + param_name + r'\b', param_value, width_str)
-        
-        # Evaluate expressions in width specification
-        try:
-            # Handle [msb:lsb] patterns first
-            if ':' in width_str:
-                parts = width_str.split(':')
-                if len(parts) == 2:
-                    try:
-                        # Evaluate both parts if they contain arithmetic
-                        msb_str = parts[0].strip()
-                        lsb_str = parts[1].strip()
-                        
-                        if re.match(r'^[\d\+\-\*\/\(\)\s]+$', msb_str):
-                            msb = eval(msb_str)
-                        else:
-                            msb = msb_str
-                            
-                        if re.match(r'^[\d\+\-\*\/\(\)\s]+$', lsb_str):
-                            lsb = eval(lsb_str)
-                        else:
-                            lsb = lsb_str
-                            
-                        width_str = f"{msb}:{lsb}"
-                    except:
-                        pass
-            elif re.match(r'^[\d\+\-\*\/\(\)\s]+$', width_str):
-                # Process single expressions
-                width_str = str(eval(width_str))
-        except:
-            pass
+        # Evaluate each side of a msb:lsb range, substituting parameter values
+        # textually where the expression is not constant
+        parts = []
+        for part in split_range(width_str):
+            expression = ConstantExpression.compile(part)
+            try:
+                parts.append(str(expression.evaluate(param_values)))
+            except ValueError:
+                parts.append(expression.substitute(param_values).strip())
+        width_str = ':'.join(parts)
         
         # Add brackets back if they were originally there
         if original_has_brackets:
@@ -2140,26 +3631,11 @@ class WrapperGenerator:
         return formatted_wires
     
     def _resolve_file_path(self, file_path: str) -> Optional[str]:
-        """Resolve file path by checking multiple locations"""
-        import os
-        
-        # Try current working directory
-        if os.path.exists(file_path):
-            return file_path
-        
-        # Try script directory (where verilog_wrapper_generator.py is located)
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        script_path = os.path.join(script_dir, file_path)
-        if os.path.exists(script_path):
-            return script_path
-        
-        # Try parent directory of current working directory
-        parent_dir = os.path.dirname(os.getcwd())
-        parent_path = os.path.join(parent_dir, file_path)
-        if os.path.exists(parent_path):
-            return parent_path
-        
-        return None
+        """Resolve file path through the current run's search path (see SearchPath)"""
+        search_paths = tuple(self.context.search_paths)
+        if self._search_path is None or self._search_path.search_paths != search_paths:
+            self._search_path = SearchPath(search_paths)
+        return self._search_path.resolve(file_path)
     
     def _format_simple_wire_declarations(self, wire_list: List[str]) -> List[str]:
         """Format simple wire declarations with proper alignment"""
@@ -2184,48 +3660,43 @@ class WrapperGenerator:
         
         return formatted_wires
     
-    def _generate_wrapper_code_advanced(self, top_module_name: str, top_module_parameters: Dict[str, str], instances: List[Instance], 
-                                      top_ports: List[Port], instance_connections: List[Dict], instance_to_top: Dict[str, str], instance_export_ports: List[Dict] = None) -> str:
-        """Generate wrapper code with advanced configuration"""
+    def _emit_wrapper_code_advanced(self, top_module_name: str, top_module_parameters: Dict[str, str], instances: List[Instance], 
+                                    top_ports: List[Port], design: Design) -> Iterator[str]:
+        """Generate wrapper code with advanced configuration, yielding one block of lines at a time
+        
+        The header, port and wire declarations form the first block and every
+        instance is its own block; joining the blocks with newlines gives the
+        complete wrapper.
+        """
         lines = []
         
         # Initialize unconnected port tracking
-        unconnected_inputs = []
-        unconnected_outputs = []
-        unconnected_inouts = []
+        unconnected = {'input': [], 'output': [], 'inout': []}
+        unconnected_stream = self._open_report_stream("Unconnected.jsonl", 'summary')
         
         # Collect all parameters needed for port widths from instances
         all_instance_params = {}
         parameter_debug_info = {}
         
+        debug_reports = self.context.wants_report('debug')
+        
         for instance in instances:
-            module_params = self._extract_parameters_from_module(instance.module.file_path)
-            # Create instance-specific parameter dict with overrides
-            instance_params = module_params.copy()
-            if instance.parameters:
-                for param_name, param_value in instance.parameters.items():
-                    instance_params[param_name] = param_value
-            
-            # Store original parameters for debug
-            parameter_debug_info[instance.instance_name] = {
-                'original': module_params.copy(),
-                'overrides': instance.parameters.copy() if instance.parameters else {},
-                'resolved': {}
-            }
-            
-            # Re-evaluate local parameters with instance-specific values
-            instance_params = self._resolve_parameter_dependencies_improved(instance_params)
+            # Instance-specific parameters: module defaults with overrides, local parameters re-evaluated
+            instance_params = self._get_instance_parameters(instance)
             all_instance_params.update(instance_params)
             
-            # Store resolved parameters for debug
-            parameter_debug_info[instance.instance_name]['resolved'] = instance_params.copy()
+            # Store original, override and resolved parameters for debug
+            if debug_reports:
+                module_params = self._get_module_parameters(instance.module.file_path, instance.module.name)
+                parameter_debug_info[instance.instance_name] = {
+                    'original': module_params.copy(),
+                    'overrides': instance.parameters.copy() if instance.parameters else {},
+                    'resolved': instance_params.copy()
+                }
         
         # Store parameter debug info
         self.debug_info['parameters'] = parameter_debug_info
         
-        # Generate immediate parameter report
-        self._generate_immediate_parameter_report(parameter_debug_info)
-        
         # Find parameters referenced in port widths
         port_width_params = set()
         for port in top_ports:
@@ -2280,123 +3751,38 @@ class WrapperGenerator:
         internal_wires = {}  # wire_name -> width
         top_port_names = {port.name for port in top_ports}
         
-        # Collect all connection wires with their widths
-        # First collect parameter values from all instances with proper override handling
-        param_values = {}
+        # Instance and port lookup tables
+        instances_by_name = {}
+        port_lookup = {}  # instance.port -> Port object
         for instance in instances:
-            # Extract base parameters from module file
-            module_params = self._extract_parameters_from_module(instance.module.file_path)
-            
-            # Create instance-specific parameter dict with overrides
-            instance_params = module_params.copy()
-            if instance.parameters:
-                for param_name, param_value in instance.parameters.items():
-                    instance_params[param_name] = param_value
-            
-            # Re-evaluate local parameters with instance-specific values
-            instance_params = self._resolve_parameter_dependencies_improved(instance_params)
-            
-            # Update global parameter values
-            param_values.update(instance_params)
+            instances_by_name.setdefault(instance.instance_name, instance)
+            for port in instance.module.ports:
+                port_lookup.setdefault(f"{instance.instance_name}.{port.name}", port)
         
-        for connection in instance_connections:
-            source = connection['source']
-            target = connection['target']
-            
+        # Collect all connection wires with their widths
+        for net in design.nets:
             # Skip special connections
-            if target in ['TIE0', 'TIE1', 'FLOAT'] or source in ['TIE0', 'TIE1', 'FLOAT']:
+            if net.target.is_special or net.source.is_special:
                 continue
             
             # Generate wire name based on connection
-            wire_name = self._generate_wire_name(source, target)
+            wire_name = net.wire_name
             
             # Find the port width from the source module
-            if '.' in source:
-                source_port, source_range = self._extract_port_and_range(source)
-                for instance in instances:
-                    if source_port.startswith(f"{instance.instance_name}."):
-                        # Get instance-specific parameter values
-                        module_params = self._extract_parameters_from_module(instance.module.file_path)
-                        instance_params = module_params.copy()
-                        if instance.parameters:
-                            for param_name, param_value in instance.parameters.items():
-                                instance_params[param_name] = param_value
-                        instance_params = self._resolve_parameter_dependencies(instance_params)
-                        
-                        port_name = source_port.split('.', 1)[1]
-                        for port in instance.module.ports:
-                            if port.name == port_name:
-                                # Use partial width if range specified
-                                if source_range:
-                                    # Calculate partial width from range
-                                    internal_wires[wire_name] = source_range
-                                else:
-                                    # Substitute instance-specific parameter values in width
-                                    width = self._substitute_parameters(port.width, instance_params) if port.width else None
-                                    internal_wires[wire_name] = width
-                                break
-                        break
-        
-        # Improved wire generation: Only create wires that are actually needed
-        # Track which wires are actually needed to avoid duplicates
-        needed_wires = set()
-        
-        # Store wire generation info for immediate reporting
-        wire_generation_info = {
-            'internal_wires': internal_wires.copy(),
-            'needed_wires': needed_wires,
-            'connections': instance_connections
-        }
-        
-        # Generate immediate wire report
-        self._generate_immediate_wire_report(wire_generation_info)
-        
-        # Check instance connections to determine needed wires
-        for connection in instance_connections:
-            source_port, source_range = self._extract_port_and_range(connection['source'])
-            target_port, target_range = self._extract_port_and_range(connection['target'])
-            
-            # Skip special connections
-            if connection['target'] in ['TIE0', 'TIE1', 'FLOAT']:
-                continue
-                
-            # Use concise wire name from source
-            wire_name = self._generate_wire_name(connection['source'], connection['target'])
-            needed_wires.add(wire_name)
-        
-        # Generate internal wires for needed connections
-        for wire_name in needed_wires:
-            # Find the source port to get its width
-            for connection in instance_connections:
-                if wire_name == self._generate_wire_name(connection['source'], connection['target']):
-                    source_port, source_range = self._extract_port_and_range(connection['source'])
-                    
-                    # Find the instance that owns this port
-                    for instance in instances:
-                        inst_port = f"{instance.instance_name}.{connection['source'].split('.')[1].split('[')[0]}"
-                        if source_port.startswith(f"{instance.instance_name}."):
-                            # Get instance-specific parameter values
-                            module_params = self._extract_parameters_from_module(instance.module.file_path)
-                            instance_params = module_params.copy()
-                            if instance.parameters:
-                                for param_name, param_value in instance.parameters.items():
-                                    instance_params[param_name] = param_value
-                            instance_params = self._resolve_parameter_dependencies_improved(instance_params)
-                            
-                            # Find the port and get its width
-                            port_name = source_port.split('.', 1)[1]
-                            for port in instance.module.ports:
-                                if port.name == port_name:
-                                    if source_range:
-                                        # Use the range as width
-                                        internal_wires[wire_name] = source_range
-                                    else:
-                                        # Use full port width
-                                        width = self._substitute_parameters(port.width, instance_params) if port.width else None
-                                        internal_wires[wire_name] = width
-                                    break
-                            break
-                    break
+            source = net.source
+            if source.instance is not None:
+                instance = instances_by_name.get(source.instance)
+                port = port_lookup.get(source.key)
+                if instance is not None and port is not None:
+                    # Use partial width if range specified
+                    if source.range:
+                        # Calculate partial width from range
+                        internal_wires[wire_name] = source.range
+                    else:
+                        # Substitute instance-specific parameter values in width
+                        instance_params = self._get_instance_parameters(instance)
+                        width = self._substitute_parameters(port.width, instance_params) if port.width else None
+                        internal_wires[wire_name] = width
         
         # Store wire debug info
         self.debug_info['wires'] = internal_wires
@@ -2409,91 +3795,68 @@ class WrapperGenerator:
             lines.append("")
         
         # Generate tie connections
-        tie_connections = []
-        for connection in instance_connections:
-            if connection['target'] in ['TIE0', 'TIE1', 'FLOAT']:
-                tie_connections.append(connection)
-        
-        for inst_port, top_port in instance_to_top.items():
-            if top_port in ['TIE0', 'TIE1', 'FLOAT']:
-                tie_connections.append({'source': inst_port, 'target': top_port})
+        tie_connections = [net for net in design.nets if net.target.is_special]
+        tie_connections.extend(net for net in design.top_nets if net.target.is_special)
         
         # Generate tie wire assignments and partial connections
         if tie_connections:
             lines.append("// Tie connections")
-            for connection in tie_connections:
-                source_port, source_range = self._extract_port_and_range(connection['source'])
+            for net in tie_connections:
+                source_wire = f"w_{net.source.key.replace('.', '_')}"
+                tie = net.target.port
                 
                 # Generate descriptive TIE wire names
-                if connection['target'] == 'TIE0':
-                    wire_name = f"w_{source_port.replace('.', '_')}_tied_to_0"
-                elif connection['target'] == 'TIE1':
-                    wire_name = f"w_{source_port.replace('.', '_')}_tied_to_1"
-                elif connection['target'] == 'FLOAT':
-                    wire_name = f"w_{source_port.replace('.', '_')}_float"
+                if tie == 'TIE0':
+                    wire_name = f"{source_wire}_tied_to_0"
+                elif tie == 'TIE1':
+                    wire_name = f"{source_wire}_tied_to_1"
                 else:
-                    wire_name = f"w_{source_port.replace('.', '_')}"
+                    wire_name = f"{source_wire}_float"
                 
                 # Handle bit range for TIE assignments
-                if source_range:
-                    # Extract bit width for proper assignment
-                    range_match = re.search(r'\[(\d+):(\d+)\]', source_range)
-                    single_bit_match = re.search(r'\[(\d+)\]', source_range)
+                if net.source.range:
+                    if net.source.bounds is None:
+                        continue
+                    # Bit width for proper assignment
+                    msb, lsb = net.source.bounds
+                    width = msb - lsb + 1
                     
-                    if range_match:
-                        msb = int(range_match.group(1))
-                        lsb = int(range_match.group(2))
-                        width = msb - lsb + 1
-                        
-                        if connection['target'] == 'TIE0':
-                            lines.append(f"    assign {wire_name} = {width}'b{'0' * width};")
-                        elif connection['target'] == 'TIE1':
-                            lines.append(f"    assign {wire_name} = {width}'b{'1' * width};")
-                        elif connection['target'] == 'FLOAT':
-                            lines.append(f"    assign {wire_name} = {width}'bz;")
-                    elif single_bit_match:
-                        if connection['target'] == 'TIE0':
-                            lines.append(f"    assign {wire_name} = 1'b0;")
-                        elif connection['target'] == 'TIE1':
-                            lines.append(f"    assign {wire_name} = 1'b1;")
-                        elif connection['target'] == 'FLOAT':
-                            lines.append(f"    assign {wire_name} = 1'bz;")
+                    if tie == 'TIE0':
+                        lines.append(f"    assign {wire_name} = {width}'b{'0' * width};")
+                    elif tie == 'TIE1':
+                        lines.append(f"    assign {wire_name} = {width}'b{'1' * width};")
+                    else:
+                        lines.append(f"    assign {wire_name} = {width}'bz;")
                 else:
                     # Single bit assignment
-                    if connection['target'] == 'TIE0':
+                    if tie == 'TIE0':
                         lines.append(f"    assign {wire_name} = 1'b0;")
-                    elif connection['target'] == 'TIE1':
+                    elif tie == 'TIE1':
                         lines.append(f"    assign {wire_name} = 1'b1;")
-                    elif connection['target'] == 'FLOAT':
+                    else:
                         lines.append(f"    assign {wire_name} = 1'bz;")
             lines.append("")
         
         # Generate partial bit connections
-        partial_connections = []
-        for inst_port, top_port in instance_to_top.items():
-            if '[' in inst_port or '[' in top_port:
-                if top_port not in ['TIE0', 'TIE1', 'FLOAT']:
-                    partial_connections.append({'source': inst_port, 'target': top_port})
-        
-        for connection in instance_connections:
-            if ('[' in connection['source'] or '[' in connection['target']) and connection['target'] not in ['TIE0', 'TIE1', 'FLOAT']:
-                partial_connections.append(connection)
+        partial_connections = [net for net in design.top_nets
+                               if (net.source.range or net.target.range) and not net.target.is_special]
+        partial_connections.extend(net for net in design.nets
+                                   if (net.source.range or net.target.range) and not net.target.is_special)
         
         if partial_connections:
             lines.append("// Partial bit connections")
-            for connection in partial_connections:
-                source_port, source_range = self._extract_port_and_range(connection['source'])
-                target_port, target_range = self._extract_port_and_range(connection['target'])
+            for net in partial_connections:
+                source_range = net.source.range
+                target_range = net.target.range
+                source_wire = f"w_{net.source.key.replace('.', '_')}"
                 
                 # For instance-to-top connections, use the target name directly
-                if '.' not in connection['target']:
+                if net.target.instance is None:
                     # This is a top-level port connection
-                    source_wire = f"w_{source_port.replace('.', '_')}"
-                    target_wire = connection['target']
+                    target_wire = str(net.target)
                 else:
                     # This is an instance-to-instance connection
-                    source_wire = f"w_{source_port.replace('.', '_')}"
-                    target_wire = f"w_{target_port.replace('.', '_')}"
+                    target_wire = f"w_{net.target.key.replace('.', '_')}"
                 
                 if source_range and target_range:
                     lines.append(f"    assign {target_wire}{target_range} = {source_wire}{source_range};")
@@ -2503,172 +3866,235 @@ class WrapperGenerator:
                     lines.append(f"    assign {target_wire}{target_range} = {source_wire};")
             lines.append("")
         
-        # Instance declarations
+        # Connectivity indexes keyed by 'instance.port', built once so every
+        # per-port lookup below is a dictionary access
+        net_index = self._build_net_index(design.nets)
+        top_index = self._build_top_index(design.top_nets)
+        export_index = self._build_export_index(design.exports)
+        port_connection_index = self._build_port_connection_index(design)
+        
+        yield "\n".join(lines)
+        
+        # Instance declarations, reused from the previous run where nothing they depend on changed
+        indexes = (export_index, top_index, net_index, port_connection_index)
         for instance in instances:
-            # Generate parameter string
-            param_str = ""
-            if instance.parameters:
-                param_list = []
-                for param_name, param_value in instance.parameters.items():
-                    param_list.append(f".{param_name}({param_value})")
-                param_str = f" #({', '.join(param_list)})"
+            yield self._instance_block(instance, indexes, unconnected, unconnected_stream)
+        
+        # Generate unconnected ports report
+        self._generate_unconnected_report(unconnected['input'], unconnected['output'], unconnected['inout'])
+        
+        yield "endmodule"
+    
+    def _instance_block(self, instance: Instance, indexes: Tuple[Dict, Dict, Dict, Dict],
+                        unconnected: Dict[str, List[str]], unconnected_stream) -> str:
+        """Return one instance block, recording its unconnected ports and warnings
+        
+        In an incremental run the block is taken from the previous run when its
+        fingerprint matches, replaying what was recorded while generating it.
+        """
+        cache = self._block_cache
+        fingerprint = None
+        if cache is not None:
+            fingerprint = self._instance_fingerprint(instance, indexes)
+            entry = cache.get(instance.instance_name, fingerprint)
+            if entry is not None:
+                ports = {port.name: port for port in instance.module.ports}
+                for port_name, bit_range in entry['unconnected']:
+                    self._record_unconnected(unconnected, unconnected_stream, instance.instance_name, ports[port_name], bit_range)
+                for error_type, message, config_line in entry['warnings']:
+                    self.error_reporter.add_warning(error_type, message, config_line)
+                return entry['text']
+        
+        warning_count = len(self.error_reporter.warnings)
+        instance_unconnected = []  # (port, bit range) in port order
+        text = self._generate_instance_block(instance, *indexes, instance_unconnected)
+        
+        for port, bit_range in instance_unconnected:
+            self._record_unconnected(unconnected, unconnected_stream, instance.instance_name, port, bit_range)
+        
+        if cache is not None:
+            warnings = [(warning.error_type, warning.message, warning.config_line)
+                        for warning in self.error_reporter.warnings[warning_count:]]
+            cache.put(instance.instance_name, fingerprint, text,
+                      [(port.name, bit_range) for port, bit_range in instance_unconnected], warnings)
+        return text
+    
+    def _instance_fingerprint(self, instance: Instance, indexes: Tuple[Dict, Dict, Dict, Dict]) -> str:
+        """Fingerprint of everything an instance block depends on"""
+        export_index, top_index, net_index, port_connection_index = indexes
+        connections = []
+        for port in instance.module.ports:
+            inst_port = f"{instance.instance_name}.{port.name}"
+            top_net = top_index.get(inst_port)
+            net = net_index.get(inst_port)
+            connections.append((
+                export_index.get(inst_port),
+                top_net.config_line if top_net is not None else None,
+                net.config_line if net is not None else None,
+                tuple(port_connection_index.get(inst_port, ()))
+            ))
+        
+        return BlockCache.fingerprint(
+            instance.module.name,
+            [(port.name, port.direction, port.width) for port in instance.module.ports],
+            list((instance.parameters or {}).items()),
+            sorted((name, str(value)) for name, value in self._get_instance_parameters(instance).items()),
+            connections
+        )
+    
+    def _generate_instance_block(self, instance: Instance, export_index: Dict[str, str], top_index: Dict[str, Net],
+                                 net_index: Dict[str, Net], port_connection_index: Dict[str, List[Optional[str]]],
+                                 unconnected: List[Tuple[Port, str]]) -> str:
+        """Generate the Verilog of one instance, appending its unconnected (port, bit range) pairs to unconnected"""
+        lines = []
+        
+        # Generate parameter string
+        param_str = ""
+        if instance.parameters:
+            param_list = []
+            for param_name, param_value in instance.parameters.items():
+                param_list.append(f".{param_name}({param_value})")
+            param_str = f" #({', '.join(param_list)})"
+        
+        lines.append(f"    {instance.module.name}{param_str} {instance.instance_name} (")
+        
+        port_connections = []
+        for port in instance.module.ports:
+            connection_name = None
             
-            lines.append(f"    {instance.module.name}{param_str} {instance.instance_name} (")
+            inst_port = f"{instance.instance_name}.{port.name}"
             
-            port_connections = []
-            for port in instance.module.ports:
-                connection_name = None
-                
-                # Check if this port is exported directly
-                is_exported = False
-                if instance_export_ports:
-                    for export_config in instance_export_ports:
-                        if (export_config['instance_name'] == instance.instance_name and 
-                            export_config['port_name'] == port.name):
-                            connection_name = export_config['export_name']
-                            is_exported = True
-                            break
-                
-                if not is_exported:
-                    # Check if connected to top port (with bit range support)
-                    port_matches = [key for key in instance.port_mapping.keys() if key.split('[')[0] == port.name]
-                    if port_matches:
-                        # Handle partial connections
-                        mapped_port = port_matches[0]
-                        top_port_name = instance.port_mapping[mapped_port]
+            # Check if this port is exported directly
+            is_exported = inst_port in export_index
+            if is_exported:
+                connection_name = export_index[inst_port]
+            
+            if not is_exported:
+                # Check if connected to top port (with bit range support)
+                top_net = top_index.get(inst_port)
+                if top_net is not None:
+                    # Handle partial connections
+                    top_port_name = str(top_net.target)
+                    
+                    # Check if it's a special connection
+                    if top_net.target.is_special:
+                        if top_port_name == 'TIE0':
+                            connection_name = f"w_{instance.instance_name}_{port.name}_tied_to_0"
+                        elif top_port_name == 'TIE1':
+                            connection_name = f"w_{instance.instance_name}_{port.name}_tied_to_1"
+                        elif top_port_name == 'FLOAT':
+                            connection_name = f"w_{instance.instance_name}_{port.name}_float"
+                    else:
+                        # Check if partial connection
+                        if top_net.source.range:
+                            connection_name = f"w_{instance.instance_name}_{port.name}"
+                        else:
+                            connection_name = top_port_name
+                else:
+                    # Check if connected to another instance
+                    net = net_index.get(inst_port)
+                    if net is not None:
+                        other_end = net.target if net.source.key == inst_port else net.source
                         
-                        # Check if it's a special connection
-                        if top_port_name in ['TIE0', 'TIE1', 'FLOAT']:
-                            if top_port_name == 'TIE0':
+                        if other_end.is_special:
+                            if other_end.port == 'TIE0':
                                 connection_name = f"w_{instance.instance_name}_{port.name}_tied_to_0"
-                            elif top_port_name == 'TIE1':
+                            elif other_end.port == 'TIE1':
                                 connection_name = f"w_{instance.instance_name}_{port.name}_tied_to_1"
-                            elif top_port_name == 'FLOAT':
+                            elif other_end.port == 'FLOAT':
                                 connection_name = f"w_{instance.instance_name}_{port.name}_float"
                         else:
-                            # Check if partial connection
-                            if '[' in mapped_port:
-                                connection_name = f"w_{instance.instance_name}_{port.name}"
-                            else:
-                                connection_name = top_port_name
-                    else:
-                        # Check if connected to another instance
-                        inst_port = f"{instance.instance_name}.{port.name}"
-                        for connection in instance_connections:
-                            source_port, source_range = self._extract_port_and_range(connection['source'])
-                            target_port, target_range = self._extract_port_and_range(connection['target'])
-                            
-                            if source_port == inst_port:
-                                if connection['target'] in ['TIE0', 'TIE1', 'FLOAT']:
-                                    if connection['target'] == 'TIE0':
-                                        connection_name = f"w_{instance.instance_name}_{port.name}_tied_to_0"
-                                    elif connection['target'] == 'TIE1':
-                                        connection_name = f"w_{instance.instance_name}_{port.name}_tied_to_1"
-                                    elif connection['target'] == 'FLOAT':
-                                        connection_name = f"w_{instance.instance_name}_{port.name}_float"
-                                else:
-                                    connection_name = self._generate_wire_name(connection['source'], connection['target'])
-                                break
-                            elif target_port == inst_port:
-                                if connection['source'] in ['TIE0', 'TIE1', 'FLOAT']:
-                                    if connection['source'] == 'TIE0':
-                                        connection_name = f"w_{instance.instance_name}_{port.name}_tied_to_0"
-                                    elif connection['source'] == 'TIE1':
-                                        connection_name = f"w_{instance.instance_name}_{port.name}_tied_to_1"
-                                    elif connection['source'] == 'FLOAT':
-                                        connection_name = f"w_{instance.instance_name}_{port.name}_float"
-                                else:
-                                    connection_name = self._generate_wire_name(connection['source'], connection['target'])
-                                break
-                        
-                        # If not connected, assign appropriate default values based on port direction
-                        if connection_name is None:
-                            if port.direction == 'input':
-                                # For unconnected inputs, tie to appropriate default
-                                if port.width:
-                                    # Multi-bit input - tie to zero
-                                    width_value = self._get_port_width_value(port.width)
-                                    connection_name = f"{width_value}'b0"
-                                else:
-                                    # Single-bit input - tie to zero
-                                    connection_name = "1'b0"
-                            else:
-                                # For unconnected outputs/inouts, don't connect them
-                                # This is valid in Verilog - unconnected output ports are left open
-                                connection_name = None
-                
-                # Always analyze partial connections for multibit ports
-                if port.width:
-                    unconnected_ranges = self._analyze_port_partial_connections(instance, port, instance_to_top, instance_connections)
+                            connection_name = net.wire_name
                     
-                    # Add to unconnected ports list with bit range information
-                    if unconnected_ranges:
-                        for range_info in unconnected_ranges:
-                            port_info = f"{instance.instance_name}.{port.name}{range_info}"
-                            if port.direction == 'input':
-                                unconnected_inputs.append(port_info)
-                            elif port.direction == 'output':
-                                unconnected_outputs.append(port_info)
-                            elif port.direction == 'inout':
-                                unconnected_inouts.append(port_info)
-                # Skip the old unconnected logic since we handle it differently now
+                    # If not connected, assign appropriate default values based on port direction
+                    if connection_name is None:
+                        if port.direction == 'input':
+                            # For unconnected inputs, tie to appropriate default
+                            if port.width:
+                                # Multi-bit input - tie to zero
+                                width_value = self._get_port_width_value(port.width)
+                                connection_name = f"{width_value}'b0"
+                            else:
+                                # Single-bit input - tie to zero
+                                connection_name = "1'b0"
+                        else:
+                            # For unconnected outputs/inouts, don't connect them
+                            # This is valid in Verilog - unconnected output ports are left open
+                            connection_name = None
+            
+            # Always analyze partial connections for multibit ports
+            if port.width:
+                port_slices = port_connection_index.get(inst_port, [])
+                unconnected_ranges = self._analyze_port_partial_connections(instance, port, port_slices)
                 
-                # Add port connection only if connection_name exists
-                if connection_name is not None:
-                    port_connections.append(f"        .{port.name}({connection_name})")
-                else:
-                    # Add to unconnected list for reporting
-                    port_info = f"{instance.instance_name}.{port.name}"
-                    if port.direction == 'output':
-                        unconnected_outputs.append(port_info)
-                    elif port.direction == 'inout':
-                        unconnected_inouts.append(port_info)
-            
-            # Format port connections with proper alignment
-            formatted_connections = self._format_instance_connections(instance, port_connections)
-            lines.append(",\n".join(formatted_connections))
-            lines.append("    );")  
-            lines.append("")
-        
-        lines.append("endmodule")
-        
-        # Generate unconnected ports report
-        self._generate_unconnected_report(unconnected_inputs, unconnected_outputs, unconnected_inouts)
-        
+                # Add to unconnected ports list with bit range information
+                if unconnected_ranges:
+                    for range_info in unconnected_ranges:
+                        unconnected.append((port, range_info))
+            # Skip the old unconnected logic since we handle it differently now
+            
+            # Add port connection only if connection_name exists
+            if connection_name is not None:
+                port_connections.append(f"        .{port.name}({connection_name})")
+            elif port.direction != 'input':
+                # Add to unconnected list for reporting
+                unconnected.append((port, ""))
+        
+        # Format port connections with proper alignment
+        formatted_connections = self._format_instance_connections(instance, port_connections)
+        lines.append(",\n".join(formatted_connections))
+        lines.append("    );")  
+        lines.append("")
         return "\n".join(lines)
     
+    def _record_unconnected(self, unconnected: Dict[str, List[str]], stream, instance_name: str, port: Port, bit_range: str = ""):
+        """Add an unconnected port (or slice) to the report lists and stream its JSON record"""
+        ports = unconnected.get(port.direction)
+        if ports is None:
+            return
+        
+        port_info = f"{instance_name}.{port.name}{bit_range}"
+        ports.append(port_info)
+        if stream is not None:
+            record = {'direction': port.direction, 'port': port_info, 'instance': instance_name,
+                      'name': port.name, 'range': bit_range or None}
+            stream.write(json.dumps(record) + "\n")
+    
     def _generate_unconnected_report(self, unconnected_inputs: List[str], unconnected_outputs: List[str], unconnected_inouts: List[str]):
         """Generate unconnected ports report files"""
-        import os
-        
-        # Create rpt directory if it doesn't exist
-        rpt_dir = "./rpt"
-        if not os.path.exists(rpt_dir):
-            os.makedirs(rpt_dir)
+        self.debug_info['unconnected'] = {
+            'input': len(unconnected_inputs),
+            'output': len(unconnected_outputs),
+            'inout': len(unconnected_inouts)
+        }
         
         # Write unconnected input ports
-        with open(os.path.join(rpt_dir, "Unconnected_input.list"), 'w') as f:
-            f.write("# Unconnected Input Ports\n")
-            f.write("# Format: instance_name.port_name\n")
-            f.write("# Generated by Verilog Wrapper Generator\n\n")
-            for port in sorted(unconnected_inputs):
-                f.write(f"{port}\n")
+        self._add_report("Unconnected_input.list", 'summary',
+                         lambda f: self._write_unconnected_list(f, "Input", unconnected_inputs))
         
         # Write unconnected output ports
-        with open(os.path.join(rpt_dir, "Unconnected_output.list"), 'w') as f:
-            f.write("# Unconnected Output Ports\n")
-            f.write("# Format: instance_name.port_name\n")
-            f.write("# Generated by Verilog Wrapper Generator\n\n")
-            for port in sorted(unconnected_outputs):
-                f.write(f"{port}\n")
+        self._add_report("Unconnected_output.list", 'summary',
+                         lambda f: self._write_unconnected_list(f, "Output", unconnected_outputs))
         
         # Write unconnected inout ports
-        with open(os.path.join(rpt_dir, "Unconnected_inout.list"), 'w') as f:
-            f.write("# Unconnected Inout Ports\n")
-            f.write("# Format: instance_name.port_name\n")
-            f.write("# Generated by Verilog Wrapper Generator\n\n")
-            for port in sorted(unconnected_inouts):
-                f.write(f"{port}\n")
+        self._add_report("Unconnected_inout.list", 'summary',
+                         lambda f: self._write_unconnected_list(f, "Inout", unconnected_inouts))
+    
+    def _write_report_summary(self, f):
+        """Write Report_summary.json: error counts by type and unconnected port counts by direction"""
+        summary = self.error_reporter.summary()
+        if 'unconnected' in self.debug_info:
+            summary['unconnected'] = self.debug_info['unconnected']
+        json.dump(summary, f, indent=2)
+        f.write("\n")
+    
+    def _write_unconnected_list(self, f, direction: str, ports: List[str]):
+        """Write one Unconnected_*.list report"""
+        f.write(f"# Unconnected {direction} Ports\n")
+        f.write("# Format: instance_name.port_name\n")
+        f.write("# Generated by Verilog Wrapper Generator\n\n")
+        for port in sorted(ports):
+            f.write(f"{port}\n")
     
     def _generate_wrapper_code(self, top_module_name: str, instances: List[Instance], 
                              top_ports: Dict[str, Port]) -> str:
@@ -2676,9 +4102,8 @@ class WrapperGenerator:
         lines = []
         
         # Initialize unconnected port tracking
-        unconnected_inputs = []
-        unconnected_outputs = []
-        unconnected_inouts = []
+        unconnected = {'input': [], 'output': [], 'inout': []}
+        unconnected_stream = self._open_report_stream("Unconnected.jsonl", 'summary')
         
         # Module declaration
         lines.append(f"module {top_module_name} (")
@@ -2723,13 +4148,7 @@ class WrapperGenerator:
                     port_connections.append(f"        .{port.name}({wire_name})")
                     
                     # Track unconnected ports for report
-                    port_info = f"{instance.instance_name}.{port.name}"
-                    if port.direction == 'input':
-                        unconnected_inputs.append(port_info)
-                    elif port.direction == 'output':
-                        unconnected_outputs.append(port_info)
-                    elif port.direction == 'inout':
-                        unconnected_inouts.append(port_info)
+                    self._record_unconnected(unconnected, unconnected_stream, instance.instance_name, port)
             
             lines.append(",\n".join(port_connections))
             lines.append("    );")
@@ -2738,34 +4157,366 @@ class WrapperGenerator:
         lines.append("endmodule")
         
         # Generate unconnected ports report
-        self._generate_unconnected_report(unconnected_inputs, unconnected_outputs, unconnected_inouts)
+        self._generate_unconnected_report(unconnected['input'], unconnected['output'], unconnected['inout'])
         
         return "\n".join(lines)
 
 
-def main():
-    """Main function for command-line interface"""
+_batch_worker_generator = None  # per-process generator used by batch pool workers
+
+
+def _init_batch_worker(index: Dict, context: RunContext):
+    """Process pool initializer: create the worker's generator on top of the prebuilt module index"""
+    global _batch_worker_generator
+    _batch_worker_generator = WrapperGenerator(context=context)
+    _batch_worker_generator.parser.library.preload(index)
+
+
+def _run_batch_worker(config_dir: str, run_dir: str, label: str) -> Tuple[bool, str, ErrorReporter]:
+    """Process pool task: run one batch entry, capturing its console output for in-order replay"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        ok, reporter = _batch_worker_generator._run_batch_entry(config_dir, run_dir, label)
+    return ok, output.getvalue(), reporter
+
+
+def _positive_int(text: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid count '{text}'")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def _non_negative_int(text: str) -> int:
+    """argparse type for counts where 0 has a special meaning (no limit, one per CPU)"""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid count '{text}'")
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative, got {value}")
+    return value
+
+
+def _depfile_escape(path: str) -> str:
+    """Escape a path for a Make/Ninja depfile"""
+    return path.replace(' ', '\\ ').replace('#', '\\#').replace('$', '$$')
+
+
+def write_depfile(depfile: str, target: str, inputs: List[str]):
+    """Write a Make/Ninja depfile: target depends on every input file, left untouched if unchanged"""
+    lines = [f"{_depfile_escape(target)}:"]
+    lines.extend(f" {_depfile_escape(path)}" for path in dict.fromkeys(inputs))
+    with OutputFile(depfile) as f:
+        f.write(" \\\n".join(lines) + "\n")
+
+
+def serve(socket_path: str, generator: 'WrapperGenerator') -> int:
+    """Run the generator daemon: execute client command lines on one warm generator
+    
+    Listens on a Unix domain socket for requests from verilog_wrapper_client.py,
+    one JSON line {"argv": [...], "cwd": ...} per connection, and answers with
+    {"exit": ..., "stdout": ..., "stderr": ...}.  Requests are handled one at a
+    time in the client's working directory.  The module library and parameter
+    memo stay in memory between requests; every run re-checks module files
+    against their mtime and size, so edits are picked up without a restart.
+    """
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.remove(socket_path)  # stale socket left by a daemon that did not shut down cleanly
+        else:
+            print(f"Error: a generator daemon is already serving {socket_path}")
+            return 1
+        finally:
+            probe.close()
+    
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Only the owner may run commands through the daemon.  The socket is created
+    # with these permissions rather than restricted after bind, which would
+    # leave a window in which anyone could connect.
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+    server.listen()
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # shut down like Ctrl-C, removing the socket
+    print(f"Serving on {socket_path}", flush=True)
+    
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                _serve_request(conn, generator)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        os.remove(socket_path)
+    return 0
+
+
+def _serve_request(conn: socket.socket, generator: 'WrapperGenerator'):
+    """Run one client command line and send back its exit code and console output"""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    saved_cwd = os.getcwd()
+    try:
+        with conn.makefile('rb') as f:
+            request = json.loads(f.readline())
+        os.chdir(request['cwd'])
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                exit_code = main(request['argv'], generator)
+            except SystemExit as e:  # argparse errors and --help
+                exit_code = e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        stderr.write(f"Error: {e}\n")
+        exit_code = 1
+    finally:
+        os.chdir(saved_cwd)
+    
+    response = {'exit': exit_code, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+    try:
+        conn.sendall(json.dumps(response).encode('utf-8') + b"\n")
+    except OSError:
+        pass  # the client went away; nothing to report to
+
+
+def _watch_snapshot(paths: List[str]) -> Dict[str, Optional[Tuple[int, int]]]:
+    """(mtime, size) of each path, None for paths that do not exist"""
+    snapshot = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            snapshot[path] = None
+    return snapshot
+
+
+def watch(generator: 'WrapperGenerator', config_dir: str, output_file: Optional[str] = None,
+          poll_interval: float = 0.5, debounce: float = 0.3) -> int:
+    """Regenerate the wrapper whenever the configuration or a module file changes, until interrupted
+    
+    Polls the configuration directory, its files and the module files the last
+    run resolved; instance file names that did not resolve are looked up again
+    on every poll, so creating a missing module file also triggers a run.  A
+    burst of changes is waited out until nothing has changed for debounce
+    seconds.  Each run reuses the generator's module library and parameter
+    memo, so only changed modules are parsed again, and with an output file
+    unchanged instance blocks are spliced in (--incremental).
+    """
+    if output_file:
+        generator.context = replace(generator.context, incremental=True)
+    
+    def watched_paths() -> List[str]:
+        try:
+            config_files = [os.path.join(config_dir, name) for name in sorted(os.listdir(config_dir))]
+        except OSError:
+            config_files = []
+        return [config_dir] + config_files + generator.input_files
+    
+    def watch_state(paths: List[str]) -> Dict[str, object]:
+        state = _watch_snapshot(paths)
+        if generator.unresolved_files:
+            # A fresh SearchPath lists the directories again, so new files are seen
+            search_path = SearchPath(generator.context.search_paths)
+            for name in dict.fromkeys(generator.unresolved_files):
+                try:
+                    state[name] = search_path.resolve(name)
+                except AmbiguousFileError:
+                    state[name] = AmbiguousFileError.__name__
+        return state
+    
+    try:
+        while True:
+            start = time.perf_counter()
+            ok = _watch_regenerate(generator, config_dir, output_file)
+            print(f"[watch] {'Regenerated' if ok else 'Generation failed'} in {time.perf_counter() - start:.3f} s; "
+                  f"watching for changes (Ctrl-C to stop)", flush=True)
+            
+            paths = watched_paths()
+            snapshot = watch_state(paths)
+            while watch_state(paths) == snapshot:
+                time.sleep(poll_interval)
+            
+            # Debounce: wait until a burst of saves has settled
+            settled = watch_state(watched_paths())
+            while True:
+                time.sleep(debounce)
+                current = watch_state(watched_paths())
+                if current == settled:
+                    break
+                settled = current
+            
+            changed = [path for path in settled if settled[path] != snapshot.get(path)]
+            print(f"\n[watch] Changed: {', '.join(changed) if changed else config_dir}")
+    except KeyboardInterrupt:
+        return 0
+
+
+def _watch_regenerate(generator: 'WrapperGenerator', config_dir: str, output_file: Optional[str]) -> bool:
+    """One watch-mode run, printing like a normal CLI run; errors are printed rather than raised"""
+    try:
+        if output_file:
+            ok = generator.write_wrapper_from_config(config_dir, output_file)
+            for path, status in generator.output_status.items():
+                print(f"Wrapper {'generated' if status == 'written' else 'unchanged'}: {path}")
+            return ok
+        
+        wrapper_code = generator.generate_wrapper_from_config(config_dir)
+        if wrapper_code:
+            print(wrapper_code)
+        return bool(wrapper_code)
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+
+
+def main(argv: Optional[List[str]] = None, generator: 'WrapperGenerator' = None) -> int:
+    """Main function for command-line interface
+    
+    argv defaults to the process arguments.  The daemon passes its warm
+    generator, which then runs with this command line's settings.
+    """
     parser = argparse.ArgumentParser(description='Generate Verilog wrapper files')
-    parser.add_argument('input_file', help='Input specification file (.cmd/.txt) or JSON configuration file')
-    parser.add_argument('-o', '--output', help='Output file path')
+    parser.add_argument('input_file', nargs='*',
+                        help='Input specification file (.cmd/.txt) or JSON configuration file; '
+                             'with --batch, configuration directories and/or manifest files')
+    parser.add_argument('-o', '--output', help='Output file path (with --batch: output directory, default: ./batch_out)')
+    parser.add_argument('--rpt-dir', default='./rpt',
+                        help='Directory for error, unconnected-port and debug reports (default: %(default)s; '
+                             'with --batch each run uses <output>/<run>/rpt)')
+    parser.add_argument('-y', '--search-path', action='append', default=[], metavar='DIR',
+                        help='Directory searched for instance Verilog files, like -y/+incdir+ (repeatable)')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='Do not print individual errors and warnings, only a summary by type')
+    parser.add_argument('--message-limit', type=_non_negative_int, default=20,
+                        help='Console messages shown per error type before they are only counted '
+                             '(0: no limit, default: %(default)s); reports always contain all of them')
+    parser.add_argument('--check', action='store_true',
+                        help='Only validate the configuration: no wrapper, no debug reports')
+    parser.add_argument('--max-errors', type=_positive_int,
+                        help='Stop validating after N errors and skip report generation')
+    parser.add_argument('--fail-fast', action='store_true',
+                        help='Stop at the first error (same as --max-errors 1)')
+    parser.add_argument('--report-level', choices=RunContext.REPORT_LEVELS, default='debug',
+                        help='Reports to write: none, errors (Error_report.list), summary (plus unconnected '
+                             'port lists and the final wrapper copy) or debug (plus step reports; default)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Keep per-instance state in <output>.state and regenerate only the instance '
+                             'blocks whose module, parameters or connections changed (configuration directories)')
+    parser.add_argument('--depfile', metavar='FILE',
+                        help='Write a Make/Ninja depfile listing the configuration and resolved module files '
+                             'the output depends on')
+    parser.add_argument('--watch', action='store_true',
+                        help='Regenerate whenever the configuration directory or a module file changes '
+                             '(implies --incremental with -o)')
+    parser.add_argument('--batch', action='store_true',
+                        help='Generate a wrapper for every configuration directory in one process')
+    parser.add_argument('-j', '--jobs', type=_non_negative_int, default=1,
+                        help='Worker processes for --batch (0: one per CPU, default: %(default)s)')
+    parser.add_argument('--serve', metavar='SOCKET',
+                        help='Run as a daemon on a Unix domain socket, keeping parsed modules in memory; '
+                             'send commands with verilog_wrapper_client.py')
+    parser.add_argument('--cache-dir', help='Directory for a persistent parse cache shared between runs '
+                                            '(for the daemon: set when it is started)')
+    parser.add_argument('--cache-size', type=_positive_int, default=ParseCache.DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='Parse cache size budget in MB (default: %(default)s)')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.serve and (args.input_file or generator is not None):
+        parser.error("--serve takes no input files and cannot be sent to a running daemon")
+    if not args.serve and not args.input_file:
+        parser.error("the following arguments are required: input_file")
+    if not args.serve and not args.batch and len(args.input_file) != 1:
+        parser.error("exactly one input file is required without --batch")
+    if args.check and (args.batch or args.output):
+        parser.error("--check cannot be combined with --batch or -o")
+    if args.watch and (args.serve or args.batch or args.check or generator is not None or not os.path.isdir(args.input_file[0])):
+        parser.error("--watch needs a configuration directory and cannot be combined with --batch, --check "
+                     "or sent to a daemon")
+    if args.incremental and not args.output:
+        parser.error("--incremental needs an output file (-o)")
+    if args.depfile and (args.batch or not args.output or not os.path.isdir(args.input_file[0])):
+        parser.error("--depfile needs a configuration directory and an output file (-o), without --batch")
     
     # Generate wrapper
     try:
-        generator = WrapperGenerator()
+        cache = ParseCache(args.cache_dir, args.cache_size * 1024 * 1024) if args.cache_dir and generator is None else None
+        context = RunContext(rpt_dir=args.rpt_dir, report_level=args.report_level,
+                             quiet=args.quiet, message_limit=args.message_limit or None,
+                             max_errors=1 if args.fail_fast else args.max_errors,
+                             search_paths=tuple(args.search_path), incremental=args.incremental)
+        if generator is None:
+            generator = WrapperGenerator(cache=cache, context=context)
+        else:
+            generator.context = context  # daemon request: warm generator, this command line's settings
+        
+        if args.serve:
+            return serve(args.serve, generator)
+        
+        if args.batch:
+            # Directories are used as given, any other input is a manifest listing directories
+            config_dirs = []
+            for path in args.input_file:
+                if os.path.isdir(path):
+                    config_dirs.append(path)
+                else:
+                    config_dirs.extend(generator.config_parser.parse_batch_manifest(path))
+            
+            jobs = args.jobs or os.cpu_count() or 1
+            results = generator.generate_batch(config_dirs, args.output or "./batch_out", jobs)
+            return 0 if all(results.values()) else 1
+        
+        input_file = args.input_file[0]
+        
+        if args.watch:
+            return watch(generator, input_file, args.output)
+        
+        if args.check:
+            # Validation only: the configuration is parsed and checked, nothing is generated
+            if os.path.isdir(input_file):
+                result = generator.check_config_directory(input_file)
+            elif input_file.endswith('.txt') or input_file.endswith('.cmd'):
+                result = generator.check_config(generator.config_parser.parse_input_spec(input_file))
+            else:
+                with open(input_file, 'r') as f:
+                    result = generator.check_config(json.load(f))
+            
+            summary = result['summary']
+            print(f"\nCheck {'passed' if result['valid'] else 'failed'}: "
+                  f"{summary['errors']} error(s), {summary['warnings']} warning(s).")
+            return 0 if result['valid'] else 1
         
         # Check if input is a directory (config files) or file
-        if os.path.isdir(args.input_file):
+        if os.path.isdir(input_file) and args.output:
+            # Configuration directory: stream straight to the output file instead of building the text in memory
+            if not generator.write_wrapper_from_config(input_file, args.output):
+                print("Error: Wrapper generation failed due to validation errors.")
+                return 1
+            for output_file, status in generator.output_status.items():
+                print(f"Wrapper {'generated' if status == 'written' else 'unchanged'}: {output_file}")
+                if args.depfile:
+                    write_depfile(args.depfile, output_file, generator.input_files)
+            return 0
+        elif os.path.isdir(input_file):
             # Configuration directory
-            wrapper_code = generator.generate_wrapper_from_config(args.input_file)
-        elif args.input_file.endswith('.txt') or args.input_file.endswith('.cmd'):
+            wrapper_code = generator.generate_wrapper_from_config(input_file)
+        elif input_file.endswith('.txt') or input_file.endswith('.cmd'):
             # Input specification file
-            wrapper_code = generator.generate_wrapper_from_spec(args.input_file)
+            wrapper_code = generator.generate_wrapper_from_spec(input_file)
         else:
             # JSON configuration file
             try:
-                with open(args.input_file, 'r') as f:
+                with open(input_file, 'r') as f:
                     config = json.load(f)
                 wrapper_code = generator.generate_wrapper(config)
             except json.JSONDecodeError as e:
@@ -2779,9 +4530,9 @@ def main():
         
         # Output result
         if args.output:
-            with open(args.output, 'w') as f:
-                f.write(wrapper_code)
-            print(f"Wrapper generated: {args.output}")
+            with OutputFile(args.output) as output:
+                output.write(wrapper_code)
+            print(f"Wrapper {'generated' if output.changed else 'unchanged'}: {args.output}")
         else:
             print(wrapper_code)
             